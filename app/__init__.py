@@ -21,18 +21,44 @@ def create_app(config_name='default'):
     login_manager.init_app(app)
     jwt.init_app(app)
     
+    from .middleware.auth_middleware import is_token_revoked
+    jwt.token_in_blocklist_loader(is_token_revoked)
+    
+    from .middleware.compression import response_encoding
+    response_encoding.init_app(app)
+    
     # Register blueprints
     from .routes.auth import auth_bp
     from .routes.user import user_bp
     from .routes.product import product_bp
     from .routes.ai import ai_bp
     from .routes.category import category_bp
+    from .routes.reservation import reservation_bp
+    from .routes.upload import upload_bp
     
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(user_bp, url_prefix='/api/users')
     app.register_blueprint(product_bp, url_prefix='/api/products')
     app.register_blueprint(ai_bp, url_prefix='/api/ai')
     app.register_blueprint(category_bp, url_prefix='/api/categories')
+    app.register_blueprint(reservation_bp, url_prefix='/api/reservations')
+    app.register_blueprint(upload_bp, url_prefix='/api/uploads')
+    
+    # Build the per-worker semantic index in the background rather than on the first search
+    if not app.testing:
+        from .utils.vector_index import semantic_index
+        semantic_index.start(app)
+    
+    # Run background jobs inside this process unless a separate worker is used
+    if app.config.get('JOB_RUNNER') == 'thread' and not app.testing:
+        from .utils.jobs import job_queue
+        job_queue.start_threads(app, app.config.get('JOB_THREADS', 2))
+    
+    @app.cli.command('rebuild-category-stats')
+    def rebuild_category_stats():
+        """Recompute the category_stats collection from products."""
+        from .utils.category_stats import rebuild
+        print(f"Rebuilt stats for {rebuild()} categories")
     
     # Error handlers
     @app.errorhandler(404)
@@ -1,19 +1,118 @@
-import os
-from openai import OpenAI
-from flask import request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from ..models.user import User
+import re
+import time
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from openai import OpenAI, APIError
+from flask import request, jsonify, current_app, Response, stream_with_context, url_for
+from flask_jwt_extended import jwt_required
+from ..middleware.auth_middleware import get_current_user, admin_required, current_user_is_admin
 from ..models.product import Product
+from ..models.generated_description import GeneratedDescription
+from ..models.job import Job
+from ..utils.ranking import rank_products
+from ..utils.ai_cache import ai_cache
+from ..utils.sse import wants_event_stream, stream_completion, iter_completion_deltas
+from ..utils.jobs import job_queue, PermanentJobError
+from ..utils.circuit_breaker import CircuitBreaker, CircuitOpenError
 
-# Initialize GitHub Copilot client
-github_token = os.environ.get("OPENAI_API_KEY")
-endpoint = "https://models.github.ai/inference"
-model = "openai/gpt-4.1"
+# GitHub Models client per (OPENAI_BASE_URL, OPENAI_API_KEY); any OpenAI-compatible server works
+_clients = {}
 
-client = OpenAI(
-    base_url=endpoint,
-    api_key=github_token,
-)
+def get_client():
+    """OpenAI client for the current app's settings, built on first use"""
+    config = current_app.config
+    settings = (config.get('OPENAI_BASE_URL'), config.get('OPENAI_API_KEY'))
+    client = _clients.get(settings)
+    if client is None:
+        client = _clients.setdefault(settings, OpenAI(base_url=settings[0], api_key=settings[1]))
+    return client
+
+def get_model():
+    return current_app.config.get('OPENAI_MODEL', 'openai/gpt-4.1')
+
+# Shared by every endpoint since they all depend on the same upstream
+llm_breaker = CircuitBreaker('llm')
+_hedge_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix='llm-hedge')
+
+# Upstream failures that trigger the non-AI fallback
+UPSTREAM_ERRORS = (CircuitOpenError, APIError)
+
+class AIRequestError(PermanentJobError):
+    """Invalid AI request; maps to an HTTP error and is never retried as a job"""
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+class AIUnavailableError(Exception):
+    """The model could not be reached and the endpoint has no local fallback"""
+
+def configure_breaker():
+    config = current_app.config
+    llm_breaker.configure(
+        failure_threshold=config.get('AI_CIRCUIT_FAILURE_THRESHOLD', 5),
+        slow_call_seconds=config.get('AI_CIRCUIT_SLOW_CALL_SECONDS', 8),
+        reset_seconds=config.get('AI_CIRCUIT_RESET_SECONDS', 30)
+    )
+
+def model_deadline(name):
+    """Per-endpoint timeout for one model call, in seconds"""
+    config = current_app.config
+    return config.get('AI_TIMEOUTS', {}).get(name, config.get('AI_TIMEOUT', 15))
+
+def hedged(fn, hedge_after):
+    """
+    Run fn and, if it has not finished after hedge_after seconds, a second
+    copy in parallel; return whichever succeeds first.
+    """
+    first = _hedge_executor.submit(fn)
+    done, _ = wait([first], timeout=hedge_after)
+    if done:
+        return first.result()
+    
+    error = None
+    for future in as_completed([first, _hedge_executor.submit(fn)]):
+        try:
+            return future.result()
+        except Exception as e:
+            error = e
+    raise error
+
+def call_model(name, **params):
+    """
+    chat.completions.create bounded by the endpoint's deadline, guarded by
+    the circuit breaker and optionally hedged (AI_HEDGE_AFTER).
+    
+    The SDK's own retries are disabled so the deadline is a real upper bound.
+    """
+    configure_breaker()
+    bounded_client = get_client().with_options(timeout=model_deadline(name), max_retries=0)
+    model = get_model()
+    create = lambda: bounded_client.chat.completions.create(model=model, **params)
+    hedge_after = current_app.config.get('AI_HEDGE_AFTER')
+    return llm_breaker.call(lambda: hedged(create, hedge_after) if hedge_after else create())
+
+def stream_model(name, **params):
+    """Streaming counterpart of call_model yielding text deltas"""
+    configure_breaker()
+    llm_breaker.before_call()
+    bounded_client = get_client().with_options(timeout=model_deadline(name), max_retries=0)
+    start = time.monotonic()
+    first_token_at = None
+    error = None
+    try:
+        completion = bounded_client.chat.completions.create(model=get_model(), stream=True, **params)
+        for content in iter_completion_deltas(completion):
+            if first_token_at is None:
+                first_token_at = time.monotonic()
+            yield content
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        # Judge streams by time to first token, not total length
+        llm_breaker.record((first_token_at or time.monotonic()) - start, error)
 
 def get_filtered_products(filters=None):
     """Helper function to get filtered products"""
@@ -31,49 +130,66 @@ def get_filtered_products(filters=None):
     
     return query.all()
 
-@jwt_required()
-def get_product_recommendations():
+def wants_async():
+    """True when the client asked for a background job via ?async=1 or Prefer: respond-async"""
+    if request.args.get('async', '').lower() in ('1', 'true', 'yes'):
+        return True
+    return 'respond-async' in request.headers.get('Prefer', '')
+
+def enqueue_ai_job(kind, data):
+    """Queue an AI request and answer 202 with a polling URL"""
+    user = get_current_user()
+    job = job_queue.enqueue(kind, data, user_id=user.id if user else None)
+    status_url = url_for('ai.get_ai_job', job_id=str(job.id))
+    response = jsonify({
+        'job_id': str(job.id),
+        'status': job.status,
+        'status_url': status_url
+    })
+    response.headers['Location'] = status_url
+    return response, 202
+
+def prepare_product_recommendations(data):
     """
-    Get AI-powered product recommendations based on user query using GitHub Copilot
+    Validate a recommendation request and build its prompt.
+    
+    Returns a context dict; when the response is already cached it holds
+    the cached payload under 'cached' and nothing else is computed.
     """
-    try:
-        current_user_id = get_jwt_identity()
-        user = User.objects(id=current_user_id).first()
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
-            
-        data = request.get_json()
-        print(f"AI Recommendation request data: {data}")  # Debug
-        user_query = data.get('query', '')
-        filters = data.get('filters', {})
-        print(f"Parsed query: '{user_query}', filters: {filters}")  # Debug
-        
-        if not user_query and not filters:
-            return jsonify({'error': 'Query or filters are required'}), 400
-        
-        # Extract budget from query if present
-        import re
-        budget_match = re.search(r'under\s*\$?(\d+)', user_query.lower())
-        if budget_match:
-            max_budget = float(budget_match.group(1))
-            filters['max_price'] = max_budget
-            print(f"Extracted budget: ${max_budget}")  # Debug
-        
-        # Get filtered products
-        products = get_filtered_products(filters)
-        products_data = [{
-            'name': p.name,
-            'description': p.description,
-            'category': p.category,
-            'price': float(p.price) if p.price else 0.0,
-            'stock': p.stock,
-            'rating': getattr(p, 'rating', 0),
-            'popularity': getattr(p, 'popularity', 0)
-        } for p in products]
-        
-        # Build the AI prompt
-        system_prompt = """You are a helpful shopping assistant. 
+    user_query = data.get('query', '')
+    filters = data.get('filters', {})
+    
+    if not user_query and not filters:
+        raise AIRequestError('Query or filters are required')
+    
+    cache_key = ai_cache.make_key('recommend', user_query, filters, get_model(), 0.7)
+    cached = ai_cache.get(cache_key)
+    if cached is not None:
+        return {'cache_key': cache_key, 'cached': cached}
+    
+    # Extract budget from query if present
+    budget_match = re.search(r'under\s*\$?(\d+)', user_query.lower())
+    if budget_match:
+        max_budget = float(budget_match.group(1))
+        filters['max_price'] = max_budget
+    
+    # Get filtered products as raw rows and keep only the best matches for the prompt
+    products = list(get_filtered_products(filters).only(
+        'id', 'name', 'description', 'category', 'price', 'stock', 'image_url').as_pymongo())
+    top_k = current_app.config.get('AI_RANK_TOP_K', 20)
+    ranked_products = rank_products(products, user_query, top_k)
+    products_data = [{
+        'name': p.get('name'),
+        'description': p.get('description'),
+        'category': p.get('category'),
+        'price': float(p['price']) if p.get('price') else 0.0,
+        'stock': p.get('stock'),
+        'rating': p.get('rating', 0),
+        'popularity': p.get('popularity', 0)
+    } for p in ranked_products]
+    
+    # Build the AI prompt
+    system_prompt = """You are a helpful shopping assistant. 
         Your task is to recommend products based on the user's query and filters.
         Consider the following when making recommendations:
         - Product name, description, and category
@@ -83,83 +199,122 @@ def get_product_recommendations():
         - Product ratings and popularity
         
         Be concise, helpful, and explain your recommendations."""
-        
-        user_prompt = f"""User query: {user_query or 'No specific query provided'}
+    
+    user_prompt = f"""User query: {user_query or 'No specific query provided'}
 
         Filters applied:
         - Category: {filters.get('category', 'Any')}
         - Price Range: ${filters.get('min_price', '0')} - ${filters.get('max_price', 'Any')}
         - In Stock Only: {filters.get('in_stock_only', False)}
 
-        Filtered Products (matching criteria):
+        Top {len(products_data)} of {len(products)} Filtered Products (best matches first):
         {products_data}
 
         Please provide:
         1. A brief response confirming the filtered results
         2. Highlight the products that best match the user's specific request
         3. Keep the response concise and focused on the available products"""
-        
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=0.7,
-            top_p=0.9,
-            max_tokens=1000
-        )
-
-        ai_response = response.choices[0].message.content
-        
-        # Get top 3 products for recommendations
-        top_products = products[:3]
-        product_recommendations = [{
-            'id': str(p.id),
-            'name': p.name,
-            'description': p.description,
-            'category': p.category,
-            'price': float(p.price) if p.price else 0.0,
-            'image_url': p.image_url,
-            'stock': p.stock
-        } for p in top_products]
-
-        return jsonify({
-            'recommendations': ai_response,
+    
+    # Get top 3 ranked products for recommendations
+    top_products = ranked_products[:3]
+    product_recommendations = [{
+        'id': str(p['_id']),
+        'name': p.get('name'),
+        'description': p.get('description'),
+        'category': p.get('category'),
+        'price': float(p['price']) if p.get('price') else 0.0,
+        'image_url': p.get('image_url'),
+        'stock': p.get('stock')
+    } for p in top_products]
+    
+    return {
+        'cache_key': cache_key,
+        'cached': None,
+        'messages': [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ],
+        'completion_params': {'temperature': 0.7, 'top_p': 0.9, 'max_tokens': 1000},
+        'result': {
             'products': product_recommendations,
-            'filtered_products_count': len(products_data),
+            'filtered_products_count': len(products),
             'filters_applied': filters
-        }), 200
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        }
+    }
 
-@jwt_required()
-def get_category_recommendations():
-    """Get AI-powered category-based recommendations"""
+def complete_product_recommendations(context):
+    """Run the model for a prepared recommendation context"""
+    if context['cached'] is not None:
+        return context['cached']
+    
     try:
-        data = request.get_json()
-        category = data.get('category', '')
-        
-        if not category:
-            return jsonify({'error': 'Category is required'}), 400
-            
-        # Get top products in this category
-        products = Product.objects(
-            category=category,
-            is_active=True,
-            stock__gt=0
-        ).order_by('-rating', '-stock').limit(5)
+        response = call_model('recommend', messages=context['messages'], **context['completion_params'])
+    except UPSTREAM_ERRORS as e:
+        print(f"AI recommendations degraded: {str(e)}")
+        return degraded_recommendations(context)
+    
+    result = dict(context['result'], recommendations=response.choices[0].message.content)
+    ai_cache.set(context['cache_key'], 'recommend', result)
+    return result
+
+def degraded_recommendations(context):
+    """Locally ranked products without model output, used while the model is unavailable"""
+    return dict(context['result'], recommendations=None, degraded=True)
+
+def stream_product_recommendations(context):
+    """SSE response for a prepared recommendation context"""
+    cached = context['cached']
+    if cached is not None:
+        return stream_completion(
+            lambda: [cached['recommendations']],
+            [('products', {k: v for k, v in cached.items() if k != 'recommendations'})],
+            lambda text: cached
+        )
+    
+    # Products go out first, then the model's tokens as they arrive
+    def finish(text):
+        final = dict(context['result'], recommendations=text)
+        ai_cache.set(context['cache_key'], 'recommend', final)
+        return final
+    
+    return stream_completion(
+        lambda: stream_model('recommend', messages=context['messages'], **context['completion_params']),
+        [('products', context['result'])],
+        finish,
+        on_error=lambda e: degraded_recommendations(context) if isinstance(e, UPSTREAM_ERRORS) else None
+    )
+
+def recommend_products(data):
+    return complete_product_recommendations(prepare_product_recommendations(data))
+
+def recommend_for_category(data):
+    """Category-based recommendations for a request payload"""
+    category = data.get('category', '')
+    
+    if not category:
+        raise AIRequestError('Category is required')
+    
+    cache_key = ai_cache.make_key('recommend_category', category, None, get_model(), 0.7)
+    cached = ai_cache.get(cache_key)
+    if cached is not None:
+        return cached
         
-        products_data = [{
-            'name': p.name,
-            'description': p.description,
-            'price': float(p.price) if p.price else 0.0,
-            'stock': p.stock,
-            'rating': getattr(p, 'rating', 0)
-        } for p in products]
-
-        system_prompt = f"""You are a shopping assistant specializing in {category}.
+    # Get top products in this category
+    products = Product.objects(
+        category=category,
+        is_active=True,
+        stock__gt=0
+    ).order_by('-rating', '-stock').limit(5)
+    
+    products_data = [{
+        'name': p.name,
+        'description': p.description,
+        'price': float(p.price) if p.price else 0.0,
+        'stock': p.stock,
+        'rating': getattr(p, 'rating', 0)
+    } for p in products]
+
+    system_prompt = f"""You are a shopping assistant specializing in {category}.
         Recommend the best products from this category based on:
         - Product quality and features
         - Customer ratings
@@ -168,54 +323,59 @@ def get_category_recommendations():
         
         Be enthusiastic but honest in your recommendations."""
 
-        response = client.chat.completions.create(
-            model=model,
+    try:
+        response = call_model(
+            'recommend_category',
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": f"Recommend the best {category} products from: {products_data}"}
             ],
             temperature=0.7
         )
+    except UPSTREAM_ERRORS as e:
+        print(f"AI category recommendations degraded: {str(e)}")
+        return {'category': category, 'recommendations': None, 'products': products_data, 'degraded': True}
 
-        return jsonify({
-            'category': category,
-            'recommendations': response.choices[0].message.content,
-            'products': products_data
-        }), 200
-
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    result = {
+        'category': category,
+        'recommendations': response.choices[0].message.content,
+        'products': products_data
+    }
+    ai_cache.set(cache_key, 'recommend_category', result)
+    return result
 
-@jwt_required()
-def get_price_based_recommendations():
-    """Get AI-powered recommendations based on price range"""
-    try:
-        data = request.get_json()
-        min_price = float(data.get('min_price', 0))
-        max_price = float(data.get('max_price', float('inf')))
-        
-        if min_price >= max_price:
-            return jsonify({'error': 'Invalid price range'}), 400
-            
-        # Get products in price range
-        products = Product.objects(
-            price__gte=min_price,
-            price__lte=max_price,
-            is_active=True,
-            stock__gt=0
-        ).order_by('-rating', 'price')
+def recommend_for_price_range(data):
+    """Price-range recommendations for a request payload"""
+    min_price = float(data.get('min_price', 0))
+    max_price = float(data.get('max_price', float('inf')))
+    
+    if min_price >= max_price:
+        raise AIRequestError('Invalid price range')
+    
+    cache_key = ai_cache.make_key('recommend_price', '', {'min_price': min_price, 'max_price': max_price}, get_model(), 0.5)
+    cached = ai_cache.get(cache_key)
+    if cached is not None:
+        return cached
         
-        if not products:
-            return jsonify({'error': 'No products found in this price range'}), 404
+    # Get products in price range
+    products = Product.objects(
+        price__gte=min_price,
+        price__lte=max_price,
+        is_active=True,
+        stock__gt=0
+    ).order_by('-rating', 'price')
+    
+    if not products:
+        raise AIRequestError('No products found in this price range', 404)
 
-        products_data = [{
-            'name': p.name,
-            'category': p.category,
-            'price': float(p.price) if p.price else 0.0,
-            'rating': getattr(p, 'rating', 0)
-        } for p in products]
+    products_data = [{
+        'name': p.name,
+        'category': p.category,
+        'price': float(p.price) if p.price else 0.0,
+        'rating': getattr(p, 'rating', 0)
+    } for p in products]
 
-        system_prompt = f"""You are a budget shopping assistant. 
+    system_prompt = f"""You are a budget shopping assistant. 
         Recommend the best value products between ${min_price} and ${max_price}.
         Consider:
         - Price-to-quality ratio
@@ -225,44 +385,40 @@ def get_price_based_recommendations():
         
         Group recommendations by price tiers if applicable."""
 
-        response = client.chat.completions.create(
-            model=model,
+    try:
+        response = call_model(
+            'recommend_price',
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": f"Recommend products in this price range: {products_data}"}
             ],
             temperature=0.5
         )
-
-        return jsonify({
+    except UPSTREAM_ERRORS as e:
+        print(f"AI price recommendations degraded: {str(e)}")
+        return {
             'price_range': f"${min_price} - ${max_price}",
-            'recommendations': response.choices[0].message.content,
-            'product_count': len(products_data)
-        }), 200
+            'recommendations': None,
+            'product_count': len(products_data),
+            'products': products_data[:10],
+            'degraded': True
+        }
 
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    result = {
+        'price_range': f"${min_price} - ${max_price}",
+        'recommendations': response.choices[0].message.content,
+        'product_count': len(products_data)
+    }
+    ai_cache.set(cache_key, 'recommend_price', result)
+    return result
 
-@jwt_required()
-def generate_product_description():
-    """
-    Generate product description using AI
-    """
-    try:
-        data = request.get_json()
-        product_name = data.get('name', '')
-        category = data.get('category', '')
-        features = data.get('features', [])
-        price = data.get('price', '')
-        
-        if not product_name or not category:
-            return jsonify({'error': 'Product name and category are required'}), 400
-            
-        system_prompt = """You are a professional product description writer. 
+def build_description_messages(product_name, category, features, price):
+    """Build the chat messages for a product description request"""
+    system_prompt = """You are a professional product description writer. 
         Create an engaging, SEO-friendly product description that highlights the key features and benefits.
         Consider the product's price point and target audience."""
-        
-        user_prompt = f"""Write a product description for:
+    
+    user_prompt = f"""Write a product description for:
         - Name: {product_name}
         - Category: {category}
         - Price: {f'${price}' if price else 'Not specified'}
@@ -270,27 +426,287 @@ def generate_product_description():
         
         Make it compelling and include relevant keywords naturally.
         Focus on benefits, not just features."""
-        
-        response = client.chat.completions.create(
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
+    
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+
+def generate_description(product_name, category, features, price):
+    """Call the model for one product description"""
+    try:
+        response = call_model(
+            'generate_description',
+            messages=build_description_messages(product_name, category, features, price),
             temperature=0.8,
-            top_p=1.0,
-            model=model
+            top_p=1.0
         )
+    except UPSTREAM_ERRORS as e:
+        raise AIUnavailableError(f'AI service temporarily unavailable: {str(e)}')
+    return response.choices[0].message.content.strip()
+
+def parse_description_request(data):
+    """
+    Validate and normalize a description request.
+
+    The returned values are exactly what goes into the prompt, and what
+    description_hash() hashes, so cached descriptions always match the
+    prompt they were generated from.
+    """
+    if not isinstance(data, dict):
+        raise AIRequestError('Request body must be a JSON object')
+    product_name = data.get('name') or ''
+    category = data.get('category') or ''
+    features = data.get('features') or []
+    
+    if not isinstance(product_name, str) or not isinstance(category, str) \
+            or not product_name.strip() or not category.strip():
+        raise AIRequestError('Product name and category are required')
+    if not isinstance(features, list) or not all(isinstance(f, str) for f in features):
+        raise AIRequestError('features must be a list of strings')
+    
+    features = [f.strip() for f in features if f.strip()]
+    return product_name.strip(), category.strip(), features, data.get('price', '')
+
+def describe_product(data):
+    """Product description for a request payload"""
+    product_name, category, features, price = parse_description_request(data)
+    return {
+        'description': generate_description(product_name, category, features, price),
+        'product': {
+            'name': product_name,
+            'category': category,
+            'price': price
+        }
+    }
+
+def description_hash(product_name, category, features, price):
+    """Content hash of the normalized inputs that determine a generated description"""
+    material = json.dumps({
+        'name': product_name,
+        'category': category,
+        'features': features,
+        'price': str(price or ''),
+        'model': get_model()
+    }, sort_keys=True)
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+job_queue.register('recommend', recommend_products)
+job_queue.register('recommend_category', recommend_for_category)
+job_queue.register('recommend_price', recommend_for_price_range)
+job_queue.register('generate_description', describe_product)
+
+@jwt_required()
+def get_product_recommendations():
+    """
+    Get AI-powered product recommendations based on user query using GitHub Copilot
+    """
+    try:
+        user = get_current_user()
         
-        description = response.choices[0].message.content
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+            
+        data = request.get_json()
+        if wants_async():
+            return enqueue_ai_job('recommend', data)
         
-        return jsonify({
-            'description': description.strip(),
-            'product': {
+        context = prepare_product_recommendations(data)
+        if wants_event_stream():
+            return stream_product_recommendations(context)
+        
+        return jsonify(complete_product_recommendations(context)), 200
+        
+    except AIRequestError as e:
+        return jsonify({'error': e.message}), e.status_code
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@jwt_required()
+def get_category_recommendations():
+    """Get AI-powered category-based recommendations"""
+    try:
+        data = request.get_json()
+        if wants_async():
+            return enqueue_ai_job('recommend_category', data)
+        
+        return jsonify(recommend_for_category(data)), 200
+
+    except AIRequestError as e:
+        return jsonify({'error': e.message}), e.status_code
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@jwt_required()
+def get_price_based_recommendations():
+    """Get AI-powered recommendations based on price range"""
+    try:
+        data = request.get_json()
+        if wants_async():
+            return enqueue_ai_job('recommend_price', data)
+        
+        return jsonify(recommend_for_price_range(data)), 200
+
+    except AIRequestError as e:
+        return jsonify({'error': e.message}), e.status_code
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@jwt_required()
+def generate_product_description():
+    """
+    Generate product description using AI
+    """
+    try:
+        data = request.get_json()
+        if wants_async():
+            return enqueue_ai_job('generate_description', data)
+        
+        if wants_event_stream():
+            product_name, category, features, price = parse_description_request(data)
+            product_info = {
                 'name': product_name,
                 'category': category,
                 'price': price
             }
-        }), 200
+            messages = build_description_messages(product_name, category, features, price)
+            return stream_completion(
+                lambda: stream_model('generate_description', messages=messages, temperature=0.8, top_p=1.0),
+                [('product', {'product': product_info})],
+                lambda text: {'description': text.strip(), 'product': product_info}
+            )
+        
+        return jsonify(describe_product(data)), 200
+        
+    except AIRequestError as e:
+        return jsonify({'error': e.message}), e.status_code
+    except AIUnavailableError as e:
+        response = jsonify({'error': str(e)})
+        response.headers['Retry-After'] = str(current_app.config.get('AI_CIRCUIT_RESET_SECONDS', 30))
+        return response, 503
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@admin_required
+def generate_product_descriptions_batch():
+    """
+    Generate descriptions for many products (Admin only)
+    
+    Items are deduplicated by a hash of their inputs; hashes already in the
+    generated_descriptions collection are answered from there and the rest
+    are sent to the model with at most AI_BATCH_CONCURRENCY calls in flight.
+    One NDJSON line per item is streamed back as soon as it is ready.
+    """
+    data = request.get_json() or {}
+    items = data.get('items')
+    max_items = current_app.config.get('AI_BATCH_MAX_ITEMS', 1000)
+    
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': 'items must be a non-empty list'}), 400
+    if len(items) > max_items:
+        return jsonify({'error': f'At most {max_items} items per batch'}), 400
+    
+    # Group item indexes by content hash so duplicates cost one call
+    groups = {}
+    inputs = {}
+    invalid = []
+    for index, item in enumerate(items):
+        try:
+            parsed = parse_description_request(item)
+        except AIRequestError as e:
+            invalid.append((index, e.message))
+            continue
+        content_hash = description_hash(*parsed)
+        groups.setdefault(content_hash, []).append(index)
+        inputs[content_hash] = parsed
+    
+    stored = {
+        doc.content_hash: doc.description
+        for doc in GeneratedDescription.objects(content_hash__in=list(groups)).only('content_hash', 'description')
+    }
+    concurrency = current_app.config.get('AI_BATCH_CONCURRENCY', 8)
+    app = current_app._get_current_object()
+    
+    def generate_in_app_context(*args):
+        with app.app_context():
+            return generate_description(*args)
+    
+    def item_line(index, content_hash, status, description=None, error=None, cached=False):
+        item = items[index]
+        line = {
+            'index': index,
+            'hash': content_hash,
+            'status': status,
+            'cached': cached,
+            'product': {
+                'name': item.get('name') if isinstance(item, dict) else None,
+                'category': item.get('category') if isinstance(item, dict) else None,
+                'price': item.get('price', '') if isinstance(item, dict) else None
+            }
+        }
+        if description is not None:
+            line['description'] = description
+        if error is not None:
+            line['error'] = error
+        return json.dumps(line) + '\n'
+    
+    def generate():
+        for index, message in invalid:
+            yield item_line(index, None, 'error', error=message)
+        
+        for content_hash, description in stored.items():
+            for index in groups[content_hash]:
+                yield item_line(index, content_hash, 'ok', description, cached=True)
+        
+        pending = [h for h in groups if h not in stored]
+        if not pending:
+            return
+        
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        try:
+            futures = {}
+            for content_hash in pending:
+                futures[executor.submit(generate_in_app_context, *inputs[content_hash])] = content_hash
+            
+            for future in as_completed(futures):
+                content_hash = futures[future]
+                try:
+                    description = future.result()
+                except Exception as e:
+                    for index in groups[content_hash]:
+                        yield item_line(index, content_hash, 'error', error=str(e))
+                    continue
+                
+                try:
+                    GeneratedDescription(content_hash=content_hash, model=get_model(), description=description).save()
+                except Exception as e:
+                    print(f"Failed to store generated description: {str(e)}")
+                for index in groups[content_hash]:
+                    yield item_line(index, content_hash, 'ok', description)
+        finally:
+            # Stop queued calls if the client goes away mid-batch
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    response = Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@admin_required
+def get_ai_cache_stats():
+    """Hit/miss statistics for the AI response cache (Admin only)"""
+    return jsonify(ai_cache.stats()), 200
+
+@jwt_required()
+def get_ai_job(job_id):
+    """Poll a background AI job (owner or admin)"""
+    try:
+        job = Job.objects(id=job_id).first()
+        user = get_current_user()
+        
+        if not job or not user or (job.user_id != str(user.id) and not current_user_is_admin()):
+            return jsonify({'error': 'Job not found'}), 404
+        
+        return jsonify(job.to_dict()), 200
         
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 400
@@ -4,6 +4,9 @@ from werkzeug.security import generate_password_hash
 from datetime import datetime
 import re
 from app.models.category import Category
+from app.utils.serializers import (serialize_category, serialize_queryset, serialize_first,
+                                   select_fields, parse_fields)
+from app.utils.category_stats import stats_for
 
 def create_category():
     try:
@@ -41,12 +44,27 @@ def create_category():
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
+def category_serializer(args):
+    """Serializer for ?fields=, and whether the virtual stats field is wanted"""
+    fields = parse_fields(args.get('fields'))
+    with_stats = not fields or 'stats' in fields
+    if fields and with_stats:
+        fields.add('name')
+    return select_fields(serialize_category, fields, extra=('stats',)), with_stats
+
+def attach_stats(categories):
+    stats = stats_for([category['name'] for category in categories])
+    for category in categories:
+        category['stats'] = stats[category['name']]
+    return categories
+
 def get_all_categories():
     try:
-        categories = Category.objects(is_active=True)
-        return jsonify({
-            'categories': [category.to_dict() for category in categories]
-        }), 200
+        serializer, with_stats = category_serializer(request.args)
+        categories = serialize_queryset(Category.objects(is_active=True), serializer)
+        if with_stats:
+            attach_stats(categories)
+        return jsonify({'categories': categories}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
@@ -55,11 +73,14 @@ def get_category(category_id):
         if not ObjectId.is_valid(category_id):
             return jsonify({'error': 'Invalid category ID'}), 400
             
-        category = Category.objects(id=category_id, is_active=True).first()
+        serializer, with_stats = category_serializer(request.args)
+        category = serialize_first(Category.objects(id=category_id, is_active=True), serializer)
         if not category:
             return jsonify({'error': 'Category not found'}), 404
+        if with_stats:
+            attach_stats([category])
             
-        return jsonify(category.to_dict()), 200
+        return jsonify(category), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 400
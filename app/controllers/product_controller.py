@@ -1,27 +1,276 @@
-from flask import request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+import csv
+import io
+import json
+from flask import request, jsonify, Response, stream_with_context, current_app
+from flask_jwt_extended import jwt_required
 from ..models.product import Product
-from ..models.user import User
+from ..models.product_tombstone import ProductTombstone
+from ..utils.pagination import keyset_page, parse_limit, InvalidCursor
+from ..utils.serializers import serialize_product, only_fields, select_fields, parse_fields, serialize_first
+from ..utils.expansion import parse_expand, expand_categories
+from ..utils.catalog_cache import catalog_cached, product_catalog
+from ..utils.vector_index import semantic_index
+from ..utils import text_search
+from ..utils import category_stats
+from ..utils.bulk_import import ProductImport, iter_rows
+from ..utils.bulk_patch import patch_products
+from ..utils.facets import FACET_FILTERS, MAX_PRICE_BUCKETS, compute_facets
+from ..middleware.auth_middleware import admin_required, current_user_is_admin
 
+EXPORT_CSV_FIELDS = ['id', 'sku', 'name', 'description', 'category', 'price', 'stock',
+                     'image_url', 'created_at', 'updated_at', 'is_active']
+
+def parse_bool(value):
+    """Interpret a query string flag such as ?in_stock=true"""
+    if value is None:
+        return None
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+def filter_products(args):
+    """Build a Product queryset from request query arguments"""
+    query = Product.objects
+    
+    if args.get('category'):
+        query = query.filter(category=args['category'])
+    if args.get('min_price') not in (None, ''):
+        query = query.filter(price__gte=float(args['min_price']))
+    if args.get('max_price') not in (None, ''):
+        query = query.filter(price__lte=float(args['max_price']))
+    
+    in_stock = parse_bool(args.get('in_stock'))
+    if in_stock is True:
+        query = query.filter(stock__gt=0)
+    elif in_stock is False:
+        query = query.filter(stock=0)
+    
+    is_active = parse_bool(args.get('is_active'))
+    if is_active is not None:
+        query = query.filter(is_active=is_active)
+    
+    return query
+
+def product_serializer(args, extra=()):
+    """Serializer for ?fields= plus the relations requested with ?expand="""
+    expand = parse_expand(args.get('expand'))
+    fields = parse_fields(args.get('fields'))
+    if fields and expand:
+        fields |= expand
+    return select_fields(serialize_product, fields, extra=extra), expand
+
+def expand_products(products, expand):
+    if 'category' in expand:
+        expand_categories(products)
+    return products
+
+@catalog_cached
 def get_products():
-    """Get all products"""
+    """Get a page of products, newest first"""
     try:
-        products = Product.objects.all()
-        return jsonify([p.to_dict() for p in products]), 200
+        limit = parse_limit(request.args.get('limit'))
+        serializer, expand = product_serializer(request.args)
+        query = filter_products(request.args)
+        # The cursor is built from created_at even when it isn't returned
+        query = query.only(*only_fields(serializer), 'created_at').as_pymongo()
+        products, next_cursor = keyset_page(query, request.args.get('cursor'), limit)
+        return jsonify({
+            'products': expand_products([serializer(p) for p in products], expand),
+            'next_cursor': next_cursor,
+            'limit': limit
+        }), 200
+    except (InvalidCursor, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         print(f"Error in get_products: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@catalog_cached
+def search_products():
+    """Full-text search over name, category and description, best match first"""
+    try:
+        query_text = (request.args.get('q') or '').strip()
+        if not query_text:
+            return jsonify({'error': 'Query parameter q is required'}), 400
+        limit = parse_limit(request.args.get('limit'), default=20)
+        serializer, expand = product_serializer(request.args, extra=('score',))
+        match = filter_products(request.args)._query
+        
+        products, next_cursor = text_search.search_products(
+            query_text, match, request.args.get('cursor'), limit, serializer)
+        return jsonify({
+            'query': query_text,
+            'products': expand_products(products, expand),
+            'next_cursor': next_cursor,
+            'limit': limit
+        }), 200
+    except (InvalidCursor, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"Error in search_products: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@catalog_cached
+def get_product_facets():
+    """Category, availability and price facets for the current filters and ?q="""
+    try:
+        args = request.args.to_dict()
+        faceted = {key for keys in FACET_FILTERS.values() for key in keys}
+        
+        base_match = filter_products({k: v for k, v in args.items() if k not in faceted})._query
+        query_text = (args.get('q') or '').strip()
+        if query_text:
+            base_match.update(text_search.text_match(query_text))
+        
+        def extra_match(exclude=()):
+            selected = {k: v for k, v in args.items() if k in faceted and k not in exclude}
+            return filter_products(selected)._query
+        
+        facet_matches = {name: extra_match(keys) for name, keys in FACET_FILTERS.items()}
+        price_buckets = parse_limit(args.get('price_buckets'),
+                                    default=current_app.config.get('FACET_PRICE_BUCKETS', 5),
+                                    maximum=MAX_PRICE_BUCKETS)
+        
+        facets = compute_facets(base_match, facet_matches, extra_match(), price_buckets)
+        return jsonify(facets), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"Error in get_product_facets: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+def semantic_search_products():
+    """Find active products whose name/description is semantically close to ?q="""
+    try:
+        query_text = (request.args.get('q') or '').strip()
+        if not query_text:
+            return jsonify({'error': 'Query parameter q is required'}), 400
+        limit = parse_limit(request.args.get('limit'), default=10, maximum=50)
+        serializer, expand = product_serializer(request.args, extra=('score',))
+        
+        matches = semantic_index.search(query_text, limit)
+        if matches is None:
+            # Index still building in this worker: answer with keyword search meanwhile
+            products, _ = text_search.search_products(
+                query_text, {'is_active': True}, None, limit, serializer)
+            return jsonify({'query': query_text, 'products': expand_products(products, expand),
+                            'degraded': True}), 200
+        scores = dict(matches)
+        rows = Product.objects(id__in=list(scores), is_active=True).only(
+            *only_fields(serializer)).as_pymongo()
+        by_id = {str(raw['_id']): raw for raw in rows}
+        
+        products = []
+        for product_id, score in matches:
+            if product_id in by_id:
+                products.append(dict(serializer(by_id[product_id]), score=round(score, 4)))
+        
+        return jsonify({'query': query_text, 'products': expand_products(products, expand)}), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"Error in semantic_search_products: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+def iter_export_rows(query, batch_size):
+    """Iterate a product query with a bounded server-side cursor"""
+    query = query.only(*only_fields(serialize_product)).as_pymongo()
+    for raw in query.no_cache().batch_size(batch_size):
+        yield serialize_product(raw)
+
+def generate_ndjson(rows):
+    for row in rows:
+        yield json.dumps(row) + '\n'
+
+def generate_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_CSV_FIELDS)
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+
+@admin_required
+def export_products():
+    """Stream the product catalog as NDJSON or CSV (Admin only)"""
+    export_format = request.args.get('format', 'ndjson').lower()
+    if export_format not in ('ndjson', 'csv'):
+        return jsonify({'error': 'format must be ndjson or csv'}), 400
+    
+    try:
+        query = filter_products(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    batch_size = current_app.config.get('EXPORT_BATCH_SIZE', 500)
+    rows = iter_export_rows(query, batch_size)
+    
+    if export_format == 'csv':
+        body, mimetype, extension = generate_csv(rows), 'text/csv', 'csv'
+    else:
+        body, mimetype, extension = generate_ndjson(rows), 'application/x-ndjson', 'ndjson'
+    
+    response = Response(stream_with_context(body), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename=products.{extension}'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+def detect_import_format(upload):
+    """Pick csv or ndjson from ?format=, the file name or the content type"""
+    import_format = (request.args.get('format') or '').lower()
+    if import_format:
+        return import_format
+    filename = (upload.filename or '') if upload else ''
+    mimetype = upload.mimetype if upload else request.mimetype
+    if filename.lower().endswith('.csv') or mimetype == 'text/csv':
+        return 'csv'
+    return 'ndjson'
+
+@admin_required
+def import_products():
+    """Upsert products from an NDJSON or CSV upload, streaming a row report (Admin only)"""
+    upload = request.files.get('file') if request.mimetype == 'multipart/form-data' else None
+    import_format = detect_import_format(upload)
+    if import_format not in ('ndjson', 'csv'):
+        return jsonify({'error': 'format must be ndjson or csv'}), 400
+    
+    stream = upload.stream if upload else request.stream
+    batch_size = current_app.config.get('IMPORT_BATCH_SIZE', 1000)
+    report = ProductImport(batch_size).run(iter_rows(stream, import_format))
+    
+    response = Response(stream_with_context(generate_ndjson(report)), mimetype='application/x-ndjson')
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@admin_required
+def bulk_patch_products():
+    """Apply many {id, set, inc} updates in one bulk write (Admin only)"""
+    data = request.get_json(silent=True) or {}
+    operations = data.get('operations')
+    max_items = current_app.config.get('BULK_PATCH_MAX_ITEMS', 1000)
+    
+    if not isinstance(operations, list) or not operations:
+        return jsonify({'error': 'operations must be a non-empty list'}), 400
+    if len(operations) > max_items:
+        return jsonify({'error': f'At most {max_items} operations per request'}), 400
+    
+    try:
+        results = patch_products(operations)
+        return jsonify({
+            'results': results,
+            'matched': sum(result['matched'] for result in results),
+            'modified': sum(result['modified'] for result in results)
+        }), 200
+    except Exception as e:
+        print(f"Error in bulk_patch_products: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
 @jwt_required()
 def create_product():
     """Create a new product (Admin only)"""
     try:
-        # Get current user
-        current_user_id = get_jwt_identity()
-        user = User.objects(id=current_user_id).first()
-        
         # Check if user is admin
-        if not user or not user.is_admin():
+        if not current_user_is_admin():
             return jsonify({'error': 'Admin access required'}), 403
         
         # Get product data from request
@@ -30,6 +279,7 @@ def create_product():
         
         # Create new product
         product = Product(
+            sku=data.get('sku') or None,
             name=data['name'],
             description=data.get('description', ''),
             category=data.get('category', 'general'),
@@ -38,6 +288,9 @@ def create_product():
             image_url=data.get('image_url', '')
         )
         product.save()
+        product_catalog.bump()
+        category_stats.record_change(None, category_stats.snapshot(product))
+        semantic_index.on_product_saved(product)
         
         return jsonify(product.to_dict()), 201
         
@@ -45,14 +298,16 @@ def create_product():
         return jsonify({'error': str(e)}), 400
 
 @jwt_required()
+@catalog_cached
 def get_product(product_id):
     """Get a single product by ID"""
     try:
-        product = Product.objects(id=product_id, is_active=True).first()
+        serializer, expand = product_serializer(request.args)
+        product = serialize_first(Product.objects(id=product_id, is_active=True), serializer)
         if not product:
             return jsonify({'error': 'Product not found'}), 404
             
-        return jsonify(product.to_dict()), 200
+        return jsonify(expand_products([product], expand)[0]), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 400
@@ -61,12 +316,8 @@ def get_product(product_id):
 def update_product(product_id):
     """Update a product (Admin only)"""
     try:
-        # Get current user
-        current_user_id = get_jwt_identity()
-        user = User.objects(id=current_user_id).first()
-        
         # Check if user is admin
-        if not user or not user.is_admin():
+        if not current_user_is_admin():
             return jsonify({'error': 'Admin access required'}), 403
             
         # Get product
@@ -74,6 +325,8 @@ def update_product(product_id):
         if not product:
             return jsonify({'error': 'Product not found'}), 404
             
+        before = category_stats.snapshot(product)
+        
         # Update product data
         data = request.get_json()
         
@@ -81,6 +334,8 @@ def update_product(product_id):
         print(f"Received data: {data}")
         
         # Explicitly update only the fields we want
+        if 'sku' in data:
+            product.sku = data['sku'] or None
         if 'name' in data:
             product.name = data['name']
         if 'description' in data:
@@ -108,6 +363,9 @@ def update_product(product_id):
                 product.created_at = datetime.utcnow()
         
         product.save()
+        product_catalog.bump()
+        category_stats.record_change(before, category_stats.snapshot(product))
+        semantic_index.on_product_saved(product)
         
         return jsonify(product.to_dict()), 200
         
@@ -118,12 +376,8 @@ def update_product(product_id):
 def delete_product(product_id):
     """Delete a product (Admin only)"""
     try:
-        # Get current user
-        current_user_id = get_jwt_identity()
-        user = User.objects(id=current_user_id).first()
-        
         # Check if user is admin
-        if not user or not user.is_admin():
+        if not current_user_is_admin():
             return jsonify({'error': 'Admin access required'}), 403
             
         # Hard delete the product
@@ -132,6 +386,10 @@ def delete_product(product_id):
             return jsonify({'error': 'Product not found'}), 404
             
         product.delete()
+        ProductTombstone(product_id=str(product_id)).save()
+        product_catalog.bump()
+        category_stats.record_change(category_stats.snapshot(product), None)
+        semantic_index.on_product_deleted(product_id)
         
         return jsonify({'message': 'Product deleted successfully'}), 200
         
@@ -0,0 +1,57 @@
+from flask import request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from ..middleware.auth_middleware import current_user_is_admin
+from ..utils import reservations
+from ..utils.reservations import ReservationError
+
+@jwt_required()
+def create_reservation():
+    """Hold stock of a product for the current user"""
+    try:
+        data = request.get_json(silent=True) or {}
+        reservation = reservations.reserve(data.get('product_id'), data.get('quantity', 1),
+                                           get_jwt_identity())
+        return jsonify(reservation.to_dict()), 201
+    except ReservationError as e:
+        return jsonify({'error': e.message}), e.status_code
+    except Exception as e:
+        print(f"Error in create_reservation: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@jwt_required()
+def get_reservation(reservation_id):
+    """Get one of the current user's reservations (any reservation for admins)"""
+    try:
+        reservation = reservations.get_reservation(reservation_id, get_jwt_identity(),
+                                                   current_user_is_admin())
+        return jsonify(reservation.to_dict()), 200
+    except ReservationError as e:
+        return jsonify({'error': e.message}), e.status_code
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+@jwt_required()
+def confirm_reservation(reservation_id):
+    """Confirm a pending reservation before it expires"""
+    try:
+        reservation = reservations.confirm(reservation_id, get_jwt_identity(),
+                                           current_user_is_admin())
+        return jsonify(reservation.to_dict()), 200
+    except ReservationError as e:
+        return jsonify({'error': e.message}), e.status_code
+    except Exception as e:
+        print(f"Error in confirm_reservation: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@jwt_required()
+def release_reservation(reservation_id):
+    """Release a pending reservation and return its stock"""
+    try:
+        reservation = reservations.release(reservation_id, get_jwt_identity(),
+                                           current_user_is_admin())
+        return jsonify(reservation.to_dict()), 200
+    except ReservationError as e:
+        return jsonify({'error': e.message}), e.status_code
+    except Exception as e:
+        print(f"Error in release_reservation: {str(e)}")
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,70 @@
+from flask import request, jsonify, current_app, send_file, url_for
+from werkzeug.formparser import FormDataParser
+from ..middleware.auth_middleware import admin_required
+from ..utils.image_store import store_image, resolve, ImageRejected, ImageWriter
+
+# Content-addressed files never change, so clients may cache them for a year
+IMAGE_MAX_AGE = 365 * 24 * 3600
+
+def store_multipart(upload_folder, allowed_extensions, max_bytes):
+    """
+    Parse a multipart upload straight into ImageWriters.
+
+    Werkzeug's default parser spools every file part to its own temporary
+    file before the view runs; here each part is hashed, sniffed and
+    size-checked as it arrives, so a bad upload is rejected mid-body and a
+    good one is written once.
+    """
+    writers = []
+    
+    def stream_factory(total_content_length, content_type, filename, content_length=None):
+        writer = ImageWriter(upload_folder, allowed_extensions, max_bytes)
+        writers.append(writer)
+        return writer
+    
+    try:
+        parser = FormDataParser(stream_factory, silent=False)
+        _, _, files = parser.parse(request.stream, request.mimetype, request.content_length,
+                                   request.mimetype_params)
+        upload = files.get('file')
+        if upload is None:
+            raise ImageRejected('No file provided')
+        return upload.stream.commit()
+    finally:
+        for writer in writers:
+            writer.discard()
+
+@admin_required
+def upload_image():
+    """Store an image by content hash (Admin only)"""
+    try:
+        config = current_app.config
+        upload_folder = config['UPLOAD_FOLDER']
+        allowed_extensions = config.get('ALLOWED_EXTENSIONS', ())
+        max_bytes = config.get('MAX_CONTENT_LENGTH')
+        if request.mimetype == 'multipart/form-data':
+            image = store_multipart(upload_folder, allowed_extensions, max_bytes)
+        else:
+            image = store_image(request.stream, upload_folder, allowed_extensions, max_bytes)
+        image['url'] = url_for('upload.get_image', name=image['name'], _external=True)
+        return jsonify(image), 200 if image['deduplicated'] else 201
+    except ImageRejected as e:
+        return jsonify({'error': e.message}), e.status_code
+    except Exception as e:
+        print(f"Error in upload_image: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+def get_image(name):
+    """Serve a stored image with Range, conditional and immutable caching support"""
+    resolved = resolve(current_app.config['UPLOAD_FOLDER'], name)
+    if resolved is None:
+        return jsonify({'error': 'Image not found'}), 404
+    path, digest, mimetype = resolved
+    try:
+        response = send_file(path, mimetype=mimetype, conditional=True,
+                             etag=digest, max_age=IMAGE_MAX_AGE)
+    except FileNotFoundError:
+        return jsonify({'error': 'Image not found'}), 404
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
@@ -1,7 +1,71 @@
 from functools import wraps
-from flask import jsonify
-from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from flask import jsonify, g, current_app
+from flask_jwt_extended import get_jwt_identity, get_jwt, verify_jwt_in_request
 from ..models.user import User
+from ..utils.cache import LRUCache
+from ..utils.token_revocation import token_revocations
+from ..utils.password_hasher import PasswordHasherBusy
+from ..utils.serializers import InvalidFields
+
+_user_cache = None
+
+def get_user_cache():
+    global _user_cache
+    if _user_cache is None:
+        _user_cache = LRUCache(
+            maxsize=current_app.config.get('USER_CACHE_SIZE', 1024),
+            ttl=current_app.config.get('USER_CACHE_TTL', 30)
+        )
+    return _user_cache
+
+def get_current_user():
+    """
+    Resolve the user behind the current JWT.
+    
+    The result is memoized on flask.g for the rest of the request and kept
+    in a small TTL cache across requests, so stacked decorators and the view
+    itself share a single lookup.
+    """
+    if 'current_user' in g:
+        return g.current_user
+    
+    current_user_id = get_jwt_identity()
+    user = None
+    if current_user_id:
+        cache = get_user_cache()
+        user = cache.get(current_user_id)
+        if user is None:
+            user = User.objects(id=current_user_id).first()
+            if user:
+                cache.set(current_user_id, user)
+    
+    g.current_user = user
+    return user
+
+def invalidate_user(user_id):
+    """Drop a user from the resolver cache after it is updated or deleted"""
+    get_user_cache().delete(str(user_id))
+    if 'current_user' in g and g.current_user and str(g.current_user.id) == str(user_id):
+        g.pop('current_user')
+
+def is_token_revoked(jwt_header, jwt_payload):
+    """token_in_blocklist_loader callback backed by the revocation set"""
+    return token_revocations.is_revoked(jwt_payload)
+
+def current_user_is_admin():
+    """
+    Check admin rights for the verified JWT.
+    
+    Tokens carrying role claims are trusted as-is, since revocation rejects
+    them once the user's role or status changes. Older tokens without the
+    claims fall back to loading the user.
+    """
+    claims = get_jwt()
+    if 'role' in claims:
+        return claims['role'] == 'admin' and claims.get('is_active', True)
+    
+    user = get_current_user()
+    return bool(user and user.is_admin())
 
 def admin_required(fn):
     """
@@ -10,10 +74,8 @@ def admin_required(fn):
     @wraps(fn)
     def wrapper(*args, **kwargs):
         verify_jwt_in_request()
-        current_user_id = get_jwt_identity()
-        user = User.objects(id=current_user_id).first()
         
-        if not user or not user.is_admin():
+        if not current_user_is_admin():
             return jsonify({'error': 'Admin access required'}), 403
             
         return fn(*args, **kwargs)
@@ -26,8 +88,10 @@ def client_required(fn):
     @wraps(fn)
     def wrapper(*args, **kwargs):
         verify_jwt_in_request()
-        current_user_id = get_jwt_identity()
-        user = User.objects(id=current_user_id).first()
+        if 'role' in get_jwt():
+            return fn(*args, **kwargs)
+        
+        user = get_current_user()
         
         if not user:
             return jsonify({'error': 'Authentication required'}), 401
@@ -43,6 +107,12 @@ def handle_errors(fn):
     def wrapper(*args, **kwargs):
         try:
             return fn(*args, **kwargs)
+        except PasswordHasherBusy as e:
+            response = jsonify({'error': str(e), 'status': 'error'})
+            response.headers['Retry-After'] = '1'
+            return response, 503
+        except InvalidFields as e:
+            return jsonify({'error': str(e), 'status': 'error'}), 400
         except Exception as e:
             return jsonify({
                 'error': str(e),
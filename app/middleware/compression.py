@@ -0,0 +1,205 @@
+import gzip
+import json
+import zlib
+from flask import request, current_app
+from ..utils.cache import LRUCache
+
+# brotli, zstandard and msgpack are optional; a missing one is never negotiated
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MSGPACK_MIMETYPE = 'application/msgpack'
+
+
+class GzipEncoder:
+    name = 'gzip'
+
+    def __init__(self, config):
+        self.level = config.get('COMPRESSION_LEVEL', 6)
+
+    def compress(self, data):
+        return gzip.compress(data, compresslevel=self.level, mtime=0)
+
+    def stream(self, chunks):
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        for chunk in chunks:
+            # Sync-flush every chunk so NDJSON lines and SSE events are not held back
+            yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
+
+
+class BrotliEncoder:
+    name = 'br'
+
+    def __init__(self, config):
+        self.quality = config.get('COMPRESSION_BROTLI_QUALITY', 4)
+
+    def compress(self, data):
+        return brotli.compress(data, quality=self.quality)
+
+    def stream(self, chunks):
+        compressor = brotli.Compressor(quality=self.quality)
+        for chunk in chunks:
+            yield compressor.process(chunk) + compressor.flush()
+        yield compressor.finish()
+
+
+class ZstdEncoder:
+    name = 'zstd'
+
+    def __init__(self, config):
+        self.level = config.get('COMPRESSION_ZSTD_LEVEL', 3)
+
+    def compress(self, data):
+        return zstandard.ZstdCompressor(level=self.level).compress(data)
+
+    def stream(self, chunks):
+        compressor = zstandard.ZstdCompressor(level=self.level).compressobj()
+        for chunk in chunks:
+            yield compressor.compress(chunk) + compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        yield compressor.flush()
+
+
+ENCODERS = {
+    'br': BrotliEncoder if brotli else None,
+    'zstd': ZstdEncoder if zstandard else None,
+    'gzip': GzipEncoder,
+}
+
+
+def iter_bytes(chunks):
+    for chunk in chunks:
+        yield chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+
+
+def add_vary(response, header):
+    if header not in response.vary:
+        response.vary.add(header)
+
+
+def weaken_etag(response):
+    """
+    A transformed body is a different representation of the same resource,
+    so a strong validator no longer applies; keep it as a weak one, which
+    still answers If-None-Match.
+    """
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+
+
+class ResponseEncoding:
+    """
+    Negotiate the wire format of API responses.
+
+    JSON bodies are re-encoded as MessagePack for clients sending
+    ``Accept: application/msgpack``. Compressible bodies above
+    COMPRESSION_MIN_SIZE are then compressed with the best coding in
+    Accept-Encoding (server preference: COMPRESSION_ALGORITHMS). Streamed
+    responses are compressed chunk by chunk. Bodies carrying a strong ETag
+    (catalog reads) keep their encoded bytes in an LRU keyed by ETag,
+    format and coding, so cache hits are not re-compressed.
+    """
+
+    def __init__(self, app=None):
+        self.cache = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.cache = LRUCache(maxsize=app.config.get('COMPRESSION_CACHE_SIZE', 256))
+        app.after_request(self.process)
+
+    def wants_msgpack(self, response):
+        if msgpack is None or response.is_streamed or response.mimetype != 'application/json':
+            return False
+        accept = request.accept_mimetypes
+        return accept.quality(MSGPACK_MIMETYPE) > accept.quality('application/json')
+
+    def choose_encoder(self, config):
+        accepted = request.accept_encodings
+        best, best_quality = None, 0
+        for name in config.get('COMPRESSION_ALGORITHMS', ('br', 'zstd', 'gzip')):
+            encoder = ENCODERS.get(name)
+            quality = accepted.quality(name)
+            if encoder is not None and quality > best_quality:
+                best, best_quality = encoder, quality
+        return best(config) if best else None
+
+    def cached(self, key, build):
+        if key is None:
+            return build()
+        body = self.cache.get(key)
+        if body is None:
+            body = build()
+            self.cache.set(key, body)
+        return body
+
+    def add_vary(self, response, config):
+        """Vary on the request headers that would change this representation"""
+        if (config.get('MSGPACK_ENABLED', True) and msgpack is not None
+                and response.mimetype == 'application/json'):
+            add_vary(response, 'Accept')
+        if config.get('COMPRESSION_ENABLED', True) and response.mimetype in config.get('COMPRESSION_MIMETYPES', ()):
+            add_vary(response, 'Accept-Encoding')
+
+    def process(self, response):
+        config = current_app.config
+        if response.status_code == 304:
+            # A 304 must carry the same Vary as the 200 it revalidates
+            self.add_vary(response, config)
+            return response
+        if (response.direct_passthrough or response.status_code < 200
+                or response.status_code in (204, 206)
+                or 'Content-Encoding' in response.headers):
+            return response
+        
+        self.add_vary(response, config)
+        etag, weak = response.get_etag()
+        key = (etag,) if etag and not weak else None
+        
+        if config.get('MSGPACK_ENABLED', True) and msgpack is not None:
+            if self.wants_msgpack(response):
+                key = key and key + ('msgpack',)
+                data = response.get_data()
+                response.set_data(self.cached(key, lambda: msgpack.packb(json.loads(data), use_bin_type=True)))
+                response.mimetype = MSGPACK_MIMETYPE
+                weaken_etag(response)
+        
+        if not config.get('COMPRESSION_ENABLED', True):
+            return response
+        if response.mimetype not in config.get('COMPRESSION_MIMETYPES', ()):
+            return response
+        
+        if not response.is_streamed:
+            if response.calculate_content_length() < config.get('COMPRESSION_MIN_SIZE', 1024):
+                return response
+        encoder = self.choose_encoder(config)
+        if encoder is None:
+            return response
+        
+        if response.is_streamed:
+            response.response = encoder.stream(iter_bytes(response.response))
+            response.headers.pop('Content-Length', None)
+        else:
+            key = key and key + (encoder.name,)
+            data = response.get_data()
+            response.set_data(self.cached(key, lambda: encoder.compress(data)))
+        response.headers['Content-Encoding'] = encoder.name
+        weaken_etag(response)
+        return response
+
+
+response_encoding = ResponseEncoding()
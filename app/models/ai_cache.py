@@ -0,0 +1,18 @@
+from mongoengine import Document, StringField, DictField, DateTimeField
+from datetime import datetime
+
+class AICacheEntry(Document):
+    """Persisted AI response, shared across workers and restarts"""
+    key = StringField(primary_key=True)
+    endpoint = StringField(required=True, max_length=50)
+    payload = DictField(required=True)
+    created_at = DateTimeField(default=datetime.utcnow)
+    expires_at = DateTimeField(required=True)
+    
+    meta = {
+        'collection': 'ai_response_cache',
+        'indexes': [
+            # Mongo's TTL monitor removes entries once expires_at has passed
+            {'fields': ['expires_at'], 'expireAfterSeconds': 0}
+        ]
+    }
@@ -0,0 +1,14 @@
+from mongoengine import Document, StringField, IntField, DateTimeField, ListField
+from datetime import datetime
+
+class CatalogVersion(Document):
+    """Monotonic version counter bumped on every catalog write"""
+    name = StringField(primary_key=True)
+    version = IntField(default=0)
+    updated_at = DateTimeField(default=datetime.utcnow)
+    # Most recent product ids behind the bumps (stock counter only), oldest first
+    changed = ListField(StringField())
+    
+    meta = {
+        'collection': 'catalog_versions'
+    }
@@ -1,5 +1,7 @@
 from mongoengine import Document, StringField, DateTimeField, BooleanField, URLField
 from datetime import datetime
+from ..utils.serializers import format_datetime
+from .category_stats import CategoryStats
 
 class Category(Document):
     """Category model for product categorization"""
@@ -11,14 +13,11 @@ class Category(Document):
     created_at = DateTimeField(default=datetime.utcnow)
     updated_at = DateTimeField(default=datetime.utcnow)
     
-    def to_dict(self):
-        def format_datetime(dt):
-            if dt is None:
-                return None
-            if isinstance(dt, str):
-                return dt
-            return dt.isoformat()
-        
+    def to_dict(self, stats=None):
+        """Serialize the category; pass ``stats`` to skip the category_stats lookup"""
+        if stats is None:
+            doc = CategoryStats.objects(category=self.name).first()
+            stats = doc.to_dict() if doc else CategoryStats().to_dict()
         return {
             'id': str(self.id),
             'name': self.name,
@@ -27,7 +26,8 @@ class Category(Document):
             'image_url': self.image_url,
             'is_active': self.is_active,
             'created_at': format_datetime(self.created_at),
-            'updated_at': format_datetime(self.updated_at)
+            'updated_at': format_datetime(self.updated_at),
+            'stats': stats
         }
     
     def update_timestamp(self):
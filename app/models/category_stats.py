@@ -0,0 +1,27 @@
+from mongoengine import Document, StringField, IntField, FloatField, DateTimeField
+from datetime import datetime
+
+class CategoryStats(Document):
+    """Materialized per-category product statistics, keyed by Product.category"""
+    category = StringField(primary_key=True)
+    product_count = IntField(default=0)
+    active_count = IntField(default=0)
+    in_stock_count = IntField(default=0)
+    total_stock = IntField(default=0)
+    min_price = FloatField()
+    max_price = FloatField()
+    updated_at = DateTimeField(default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'product_count': self.product_count,
+            'active_count': self.active_count,
+            'in_stock_count': self.in_stock_count,
+            'total_stock': self.total_stock,
+            'min_price': self.min_price,
+            'max_price': self.max_price
+        }
+    
+    meta = {
+        'collection': 'category_stats'
+    }
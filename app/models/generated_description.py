@@ -0,0 +1,13 @@
+from mongoengine import Document, StringField, DateTimeField
+from datetime import datetime
+
+class GeneratedDescription(Document):
+    """AI-written product description keyed by a hash of its inputs"""
+    content_hash = StringField(primary_key=True)
+    model = StringField(required=True)
+    description = StringField(required=True)
+    created_at = DateTimeField(default=datetime.utcnow)
+    
+    meta = {
+        'collection': 'generated_descriptions'
+    }
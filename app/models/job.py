@@ -0,0 +1,47 @@
+from mongoengine import Document, StringField, DictField, IntField, DateTimeField
+from datetime import datetime
+from ..utils.serializers import format_datetime
+
+class Job(Document):
+    """Durable background job processed by the job runner"""
+    kind = StringField(required=True, max_length=50)
+    payload = DictField()
+    status = StringField(required=True, default='queued',
+                         choices=['queued', 'running', 'succeeded', 'failed'])
+    user_id = StringField()
+    attempts = IntField(default=0)
+    max_attempts = IntField(default=3)
+    run_after = DateTimeField(default=datetime.utcnow)
+    locked_by = StringField()
+    locked_at = DateTimeField()
+    result = DictField()
+    error = StringField()
+    created_at = DateTimeField(default=datetime.utcnow)
+    updated_at = DateTimeField(default=datetime.utcnow)
+    finished_at = DateTimeField()
+    expires_at = DateTimeField()
+    
+    def to_dict(self):
+        """Convert job object to dictionary."""
+        return {
+            'id': str(self.id),
+            'kind': self.kind,
+            'status': self.status,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'result': self.result if self.status == 'succeeded' else None,
+            'error': self.error,
+            'created_at': format_datetime(self.created_at),
+            'updated_at': format_datetime(self.updated_at),
+            'finished_at': format_datetime(self.finished_at)
+        }
+    
+    meta = {
+        'collection': 'jobs',
+        'indexes': [
+            ('status', 'run_after'),
+            'user_id',
+            # Finished jobs are removed once their retention period ends
+            {'fields': ['expires_at'], 'expireAfterSeconds': 0}
+        ]
+    }
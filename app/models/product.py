@@ -1,8 +1,10 @@
-from mongoengine import Document, StringField, DecimalField, IntField, DateTimeField, BooleanField
+from mongoengine import Document, StringField, DecimalField, IntField, DateTimeField, BooleanField, ObjectIdField
 from datetime import datetime
+from ..utils.serializers import format_datetime
 
 class Product(Document):
     """Product model for storing product information"""
+    sku = StringField(max_length=64)
     name = StringField(required=True, max_length=200)
     description = StringField(required=True)
     category = StringField(required=True, max_length=100)
@@ -12,18 +14,14 @@ class Product(Document):
     created_at = DateTimeField(default=datetime.utcnow)
     updated_at = DateTimeField(default=datetime.utcnow)
     is_active = BooleanField(default=True)
+    # Marker of the last bulk patch that matched this product; never serialized
+    patch_marker = ObjectIdField(db_field='_patch')
     
     def to_dict(self):
         """Convert product object to dictionary."""
-        def format_datetime(dt):
-            if dt is None:
-                return None
-            if isinstance(dt, str):
-                return dt
-            return dt.isoformat()
-        
         return {
             'id': str(self.id),
+            'sku': self.sku,
             'name': self.name,
             'description': self.description,
             'category': self.category,
@@ -43,10 +41,22 @@ class Product(Document):
         'collection': 'products',
         'indexes': [
             'name',
+            {'fields': ['sku'], 'unique': True, 'sparse': True},
             'category',
             'price',
             'is_active',
-            {'fields': ['name', 'category'], 'unique': False}
+            {'fields': ['name', 'category'], 'unique': False},
+            # Category stats recompute price bounds from this index
+            {'fields': ['category', 'price']},
+            # Keyset pagination follows the default ordering
+            {'fields': ['-created_at', '-id']},
+            {'fields': ['is_active', '-created_at', '-id']},
+            # Full-text search; weights are mirrored in utils.text_search
+            {
+                'fields': ['$name', '$category', '$description'],
+                'default_language': 'english',
+                'weights': {'name': 10, 'category': 5, 'description': 1}
+            }
         ],
         'ordering': ['-created_at']
     }
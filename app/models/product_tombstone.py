@@ -0,0 +1,18 @@
+from mongoengine import Document, StringField, DateTimeField
+from datetime import datetime
+
+# Seconds a tombstone is kept; index snapshots older than this do a full reconcile
+TOMBSTONE_RETENTION = 7 * 24 * 3600
+
+class ProductTombstone(Document):
+    """Marker left by a hard product delete so per-worker indexes can catch up"""
+    product_id = StringField(primary_key=True)
+    deleted_at = DateTimeField(default=datetime.utcnow)
+    
+    meta = {
+        'collection': 'product_tombstones',
+        'indexes': [
+            # Serves the "deleted since" sync query and expires old markers
+            {'fields': ['deleted_at'], 'expireAfterSeconds': TOMBSTONE_RETENTION}
+        ]
+    }
@@ -0,0 +1,40 @@
+from mongoengine import Document, StringField, ObjectIdField, IntField, DateTimeField
+from datetime import datetime
+from ..utils.serializers import format_datetime
+
+class Reservation(Document):
+    """Stock held for a user until it is confirmed, released or expires"""
+    product_id = ObjectIdField(required=True)
+    user_id = StringField(required=True)
+    quantity = IntField(required=True, min_value=1)
+    status = StringField(required=True, default='pending',
+                         choices=['pending', 'confirmed', 'released', 'expired'])
+    expires_at = DateTimeField(required=True)
+    created_at = DateTimeField(default=datetime.utcnow)
+    updated_at = DateTimeField(default=datetime.utcnow)
+    purge_at = DateTimeField()
+    
+    def to_dict(self):
+        """Convert reservation object to dictionary."""
+        return {
+            'id': str(self.id),
+            'product_id': str(self.product_id),
+            'user_id': self.user_id,
+            'quantity': self.quantity,
+            'status': self.status,
+            'expires_at': format_datetime(self.expires_at),
+            'created_at': format_datetime(self.created_at),
+            'updated_at': format_datetime(self.updated_at)
+        }
+    
+    meta = {
+        'collection': 'reservations',
+        'indexes': [
+            # The expiry sweep scans pending holds by deadline
+            ('status', 'expires_at'),
+            'user_id',
+            # Records are removed once purge_at passes; pending holds have
+            # purge_at well after expires_at so the sweep returns their stock first
+            {'fields': ['purge_at'], 'expireAfterSeconds': 0}
+        ]
+    }
@@ -0,0 +1,15 @@
+from mongoengine import Document, StringField, IntField, DateTimeField
+from datetime import datetime
+
+class TokenRevocation(Document):
+    """Lowest token_version still accepted for a user"""
+    user_id = StringField(primary_key=True)
+    min_version = IntField(required=True, default=0)
+    updated_at = DateTimeField(default=datetime.utcnow)
+    
+    meta = {
+        'collection': 'token_revocations',
+        'indexes': [
+            'updated_at'
+        ]
+    }
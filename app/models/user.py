@@ -1,6 +1,7 @@
-from mongoengine import Document, StringField, DateTimeField, BooleanField
+from mongoengine import Document, StringField, DateTimeField, BooleanField, IntField
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+from ..utils.password_hasher import password_hasher
+from ..utils.serializers import format_datetime
 
 class User(Document):
     """User model for authentication and authorization"""
@@ -11,25 +12,23 @@ class User(Document):
     created_at = DateTimeField(default=datetime.utcnow)
     updated_at = DateTimeField(default=datetime.utcnow)
     is_active = BooleanField(default=True)
+    token_version = IntField(default=0)
     
     def set_password(self, password):
         """Create hashed password."""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
         self.updated_at = datetime.utcnow()
     
     def check_password(self, password):
         """Check hashed password."""
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
+    
+    def password_needs_rehash(self):
+        """Check if the stored hash uses an outdated method or cost."""
+        return password_hasher.needs_rehash(self.password_hash)
     
     def to_dict(self):
         """Convert user object to dictionary."""
-        def format_datetime(dt):
-            if dt is None:
-                return None
-            if isinstance(dt, str):
-                return dt
-            return dt.isoformat()
-        
         return {
             'id': str(self.id),
             'username': self.username,
@@ -44,6 +43,18 @@ class User(Document):
         """Check if user has admin role."""
         return self.role == 'admin'
     
+    def token_claims(self):
+        """Claims embedded in JWTs so role checks need no database lookup."""
+        return {
+            'role': self.role,
+            'is_active': self.is_active,
+            'token_version': self.token_version or 0
+        }
+    
+    def bump_token_version(self):
+        """Invalidate every token issued before this call."""
+        self.token_version = (self.token_version or 0) + 1
+    
     meta = {
         'collection': 'users',
         'indexes': [
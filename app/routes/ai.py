@@ -9,3 +9,6 @@ ai_bp.route('/recommend', methods=['POST'])(ai_controller.get_product_recommenda
 ai_bp.route('/recommend/category', methods=['POST'])(ai_controller.get_category_recommendations)
 ai_bp.route('/recommend/price', methods=['POST'])(ai_controller.get_price_based_recommendations)
 ai_bp.route('/generate/description', methods=['POST'])(ai_controller.generate_product_description)
+ai_bp.route('/generate/descriptions', methods=['POST'])(ai_controller.generate_product_descriptions_batch)
+ai_bp.route('/cache/stats', methods=['GET'])(ai_controller.get_ai_cache_stats)
+ai_bp.route('/jobs/<job_id>', methods=['GET'])(ai_controller.get_ai_job)
@@ -1,5 +1,4 @@
 from flask import Blueprint, request, jsonify
-from werkzeug.security import generate_password_hash, check_password_hash
 from flask_jwt_extended import (
     create_access_token, 
     create_refresh_token,
@@ -8,11 +7,21 @@ from flask_jwt_extended import (
     get_jwt
 )
 from ..models.user import User
-from ..middleware.auth_middleware import handle_errors, admin_required, client_required
+from ..utils.serializers import serialize_user, serialize_queryset, serialize_first, select_fields
+from ..middleware.auth_middleware import handle_errors, admin_required, client_required, invalidate_user
+from ..utils.token_revocation import token_revocations, REVOKE_ALL
+from ..utils.password_hasher import password_hasher, PasswordHasherBusy
 
 # Create a Blueprint for authentication routes
 auth_bp = Blueprint('auth', __name__)
 
+def issue_tokens(user):
+    """Create access and refresh tokens carrying the user's role claims"""
+    claims = user.token_claims()
+    access_token = create_access_token(identity=str(user.id), additional_claims=claims)
+    refresh_token = create_refresh_token(identity=str(user.id), additional_claims=claims)
+    return access_token, refresh_token
+
 @auth_bp.route('/test-db', methods=['GET'])
 def test_db():
     """Test database connection"""
@@ -90,8 +99,7 @@ def register():
         return jsonify({'error': f'Failed to save user: {str(e)}'}), 500
     
     # Generate tokens
-    access_token = create_access_token(identity=str(user.id))
-    refresh_token = create_refresh_token(identity=str(user.id))
+    access_token, refresh_token = issue_tokens(user)
     
     return jsonify({
         'message': 'User registered successfully',
@@ -137,9 +145,17 @@ def login():
     if not user or not user.check_password(data['password']):
         return jsonify({'error': 'Invalid email or password'}), 401
     
+    # Upgrade hashes made with an older method or cost in place; the password
+    # is already verified, so a busy or slow pool just postpones the upgrade
+    if user.password_needs_rehash():
+        try:
+            user.password_hash = password_hasher.hash(data['password'])
+            User.objects(id=user.id).update_one(set__password_hash=user.password_hash)
+        except PasswordHasherBusy as e:
+            print(f"Skipping password rehash: {str(e)}")
+    
     # Create tokens
-    access_token = create_access_token(identity=str(user.id))
-    refresh_token = create_refresh_token(identity=str(user.id))
+    access_token, refresh_token = issue_tokens(user)
     
     return jsonify({
         'message': 'Login successful',
@@ -167,7 +183,7 @@ def refresh():
     if not user:
         return jsonify({'error': 'User not found'}), 404
     
-    new_token = create_access_token(identity=current_user_id)
+    new_token = create_access_token(identity=current_user_id, additional_claims=user.token_claims())
     
     return jsonify({
         'access_token': new_token,
@@ -190,12 +206,13 @@ def get_profile():
         description: Unauthorized
     """
     current_user_id = get_jwt_identity()
-    user = User.objects(id=current_user_id).first()
+    serializer = select_fields(serialize_user, request.args.get('fields'))
+    user = serialize_first(User.objects(id=current_user_id), serializer)
     
     if not user:
         return jsonify({'error': 'User not found'}), 404
         
-    return jsonify(user.to_dict()), 200
+    return jsonify(user), 200
 
 @auth_bp.route('/profile', methods=['PUT'])
 @jwt_required()
@@ -249,17 +266,26 @@ def update_profile():
         user.email = data['email']
     
     # Update password if current_password and new_password are provided
+    password_changed = False
     if 'current_password' in data and 'new_password' in data:
         if not user.check_password(data['current_password']):
             return jsonify({'error': 'Current password is incorrect'}), 400
         user.set_password(data['new_password'])
+        user.bump_token_version()
+        password_changed = True
     
     user.save()
-    
-    return jsonify({
+    invalidate_user(user.id)
+    response = {
         'message': 'Profile updated successfully',
         'user': user.to_dict()
-    }), 200
+    }
+    if password_changed:
+        token_revocations.revoke(user.id, user.token_version)
+        # The caller's current tokens were just revoked; hand out new ones
+        response['access_token'], response['refresh_token'] = issue_tokens(user)
+    
+    return jsonify(response), 200
 
 @auth_bp.route('/admin/users', methods=['GET'])
 @jwt_required()
@@ -277,8 +303,8 @@ def get_all_users():
       403:
         description: Admin access required
     """
-    users = User.objects.all()
-    return jsonify([user.to_dict() for user in users]), 200
+    serializer = select_fields(serialize_user, request.args.get('fields'))
+    return jsonify(serialize_queryset(User.objects, serializer)), 200
 
 @auth_bp.route('/admin/users/<user_id>', methods=['GET'])
 @jwt_required()
@@ -303,11 +329,12 @@ def get_user(user_id):
       404:
         description: User not found
     """
-    user = User.objects(id=user_id).first()
+    serializer = select_fields(serialize_user, request.args.get('fields'))
+    user = serialize_first(User.objects(id=user_id), serializer)
     if not user:
         return jsonify({'error': 'User not found'}), 404
         
-    return jsonify(user.to_dict()), 200
+    return jsonify(user), 200
 
 @auth_bp.route('/admin/users/<user_id>', methods=['PUT'])
 @jwt_required()
@@ -353,6 +380,7 @@ def update_user(user_id):
         return jsonify({'error': 'User not found'}), 404
         
     data = request.get_json()
+    previous_claims = user.token_claims()
     
     if 'username' in data and data['username'] != user.username:
         if User.objects(username=data['username']).first():
@@ -370,7 +398,15 @@ def update_user(user_id):
     if 'is_active' in data:
         user.is_active = data['is_active']
     
+    # Role or status changes invalidate the claims in issued tokens
+    claims_changed = user.token_claims() != previous_claims
+    if claims_changed:
+        user.bump_token_version()
+    
     user.save()
+    invalidate_user(user.id)
+    if claims_changed:
+        token_revocations.revoke(user.id, user.token_version)
     
     return jsonify({
         'message': 'User updated successfully',
@@ -410,5 +446,7 @@ def delete_user(user_id):
         return jsonify({'error': 'Cannot delete your own account'}), 400
     
     user.delete()
+    invalidate_user(user_id)
+    token_revocations.revoke(user_id, REVOKE_ALL)
     
     return jsonify({'message': 'User deleted successfully'}), 200
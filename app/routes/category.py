@@ -1,6 +1,6 @@
-from flask import Blueprint, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from ..models.user import User
+from flask import Blueprint
+from flask_jwt_extended import jwt_required
+from ..middleware.auth_middleware import admin_required
 from ..controllers.category_controller import (
     create_category, 
     get_all_categories, 
@@ -9,22 +9,6 @@ from ..controllers.category_controller import (
     delete_category
 )
 
-def admin_required(fn):
-    """Decorator to ensure the user is an admin"""
-    def wrapper(*args, **kwargs):
-        current_user_id = get_jwt_identity()
-        user = User.objects(id=current_user_id).first()
-        
-        if not user or not user.is_admin():
-            return jsonify({'error': 'Admin access required'}), 403
-            
-        return fn(*args, **kwargs)
-    
-    # Preserve the original function's name and docstring
-    wrapper.__name__ = fn.__name__
-    wrapper.__doc__ = fn.__doc__
-    return wrapper
-
 category_bp = Blueprint('category', __name__)
 
 # Create a new category (Admin only)
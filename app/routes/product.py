@@ -7,6 +7,12 @@ product_bp = Blueprint('product', __name__)
 # Define routes
 product_bp.route('/', methods=['GET'])(product_controller.get_products)
 product_bp.route('/', methods=['POST'])(product_controller.create_product)
+product_bp.route('/', methods=['PATCH'])(product_controller.bulk_patch_products)
+product_bp.route('/import', methods=['POST'])(product_controller.import_products)
+product_bp.route('/export', methods=['GET'])(product_controller.export_products)
+product_bp.route('/search', methods=['GET'])(product_controller.search_products)
+product_bp.route('/facets', methods=['GET'])(product_controller.get_product_facets)
+product_bp.route('/semantic-search', methods=['GET'])(product_controller.semantic_search_products)
 product_bp.route('/<product_id>', methods=['GET'])(product_controller.get_product)
 product_bp.route('/<product_id>', methods=['PUT'])(product_controller.update_product)
 product_bp.route('/<product_id>', methods=['DELETE'])(product_controller.delete_product)
@@ -0,0 +1,11 @@
+from flask import Blueprint
+from ..controllers import reservation_controller
+
+# Create a Blueprint for stock reservation routes
+reservation_bp = Blueprint('reservation', __name__)
+
+# Define routes
+reservation_bp.route('/', methods=['POST'])(reservation_controller.create_reservation)
+reservation_bp.route('/<reservation_id>', methods=['GET'])(reservation_controller.get_reservation)
+reservation_bp.route('/<reservation_id>/confirm', methods=['POST'])(reservation_controller.confirm_reservation)
+reservation_bp.route('/<reservation_id>/release', methods=['POST'])(reservation_controller.release_reservation)
@@ -0,0 +1,9 @@
+from flask import Blueprint
+from ..controllers import upload_controller
+
+# Create a Blueprint for upload routes
+upload_bp = Blueprint('upload', __name__)
+
+# Define routes
+upload_bp.route('/images', methods=['POST'])(upload_controller.upload_image)
+upload_bp.route('/images/<name>', methods=['GET'])(upload_controller.get_image)
@@ -1,7 +1,9 @@
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from ..models.user import User
-from ..middleware.auth_middleware import admin_required, handle_errors
+from ..utils.serializers import serialize_user, serialize_queryset, serialize_first, select_fields
+from ..middleware.auth_middleware import admin_required, handle_errors, invalidate_user
+from ..utils.token_revocation import token_revocations, REVOKE_ALL
 
 # Create a Blueprint for user routes
 user_bp = Blueprint('user', __name__)
@@ -12,8 +14,8 @@ user_bp = Blueprint('user', __name__)
 @handle_errors
 def get_users():
     """Get all users (Admin only)"""
-    users = User.objects.all()
-    return jsonify([user.to_dict() for user in users]), 200
+    serializer = select_fields(serialize_user, request.args.get('fields'))
+    return jsonify(serialize_queryset(User.objects, serializer)), 200
 
 @user_bp.route('/<user_id>', methods=['GET'])
 @jwt_required()
@@ -21,10 +23,11 @@ def get_users():
 @handle_errors
 def get_user(user_id):
     """Get a specific user by ID (Admin only)"""
-    user = User.objects(id=user_id).first()
+    serializer = select_fields(serialize_user, request.args.get('fields'))
+    user = serialize_first(User.objects(id=user_id), serializer)
     if not user:
         return jsonify({'error': 'User not found'}), 404
-    return jsonify(user.to_dict()), 200
+    return jsonify(user), 200
 
 @user_bp.route('/<user_id>', methods=['PUT'])
 @jwt_required()
@@ -43,6 +46,8 @@ def update_user(user_id):
     if str(user.id) == current_user_id and 'role' in data:
         return jsonify({'error': 'Cannot modify your own role'}), 400
     
+    previous_claims = user.token_claims()
+    
     if 'username' in data:
         user.username = data['username']
     if 'email' in data:
@@ -52,7 +57,15 @@ def update_user(user_id):
     if 'is_active' in data:
         user.is_active = data['is_active']
     
+    # Role or status changes invalidate the claims in issued tokens
+    claims_changed = user.token_claims() != previous_claims
+    if claims_changed:
+        user.bump_token_version()
+    
     user.save()
+    invalidate_user(user.id)
+    if claims_changed:
+        token_revocations.revoke(user.id, user.token_version)
     return jsonify(user.to_dict()), 200
 
 @user_bp.route('/<user_id>', methods=['DELETE'])
@@ -72,4 +85,6 @@ def delete_user(user_id):
         return jsonify({'error': 'Cannot delete your own account'}), 400
     
     user.delete()
+    invalidate_user(user_id)
+    token_revocations.revoke(user_id, REVOKE_ALL)
     return jsonify({'message': 'User deleted successfully'}), 200
@@ -0,0 +1,112 @@
+import hashlib
+import json
+import re
+import threading
+from datetime import datetime, timedelta
+from flask import current_app
+from .cache import LRUCache
+from .catalog_cache import product_catalog
+from ..models.ai_cache import AICacheEntry
+
+QUERY_TOKEN_RE = re.compile(r'[a-z0-9$.]+')
+
+
+def normalize_query(query):
+    """Lowercase and drop punctuation/extra whitespace so near-identical queries share a key"""
+    return ' '.join(QUERY_TOKEN_RE.findall((query or '').lower())).strip('. ')
+
+
+class AIResponseCache:
+    """
+    Two-tier cache for AI endpoint responses.
+
+    Tier one is a per-worker LRU, tier two a Mongo collection with a TTL
+    index, so entries are shared between workers and survive restarts.
+    Keys include the catalog version, so any product write retires every
+    cached recommendation built from the old catalog.
+    """
+
+    def __init__(self):
+        self._local = None
+        self._lock = threading.Lock()
+        self.counters = {'local_hits': 0, 'store_hits': 0, 'misses': 0, 'store_errors': 0}
+
+    @property
+    def local(self):
+        if self._local is None:
+            self._local = LRUCache(
+                maxsize=current_app.config.get('AI_CACHE_SIZE', 512),
+                ttl=current_app.config.get('AI_CACHE_TTL', 3600)
+            )
+        return self._local
+
+    def enabled(self):
+        return current_app.config.get('AI_CACHE_ENABLED', True)
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def make_key(self, endpoint, query='', filters=None, model='', temperature=None):
+        version, _ = product_catalog.current()
+        material = json.dumps({
+            'endpoint': endpoint,
+            'query': normalize_query(query),
+            'filters': filters or {},
+            'model': model,
+            'temperature': temperature,
+            'catalog_version': version
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        if not self.enabled():
+            return None
+        payload = self.local.get(key)
+        if payload is not None:
+            self._count('local_hits')
+            return payload
+        
+        try:
+            entry = AICacheEntry.objects(key=key, expires_at__gt=datetime.utcnow()).first()
+        except Exception as e:
+            print(f"AI cache lookup failed: {str(e)}")
+            self._count('store_errors')
+            entry = None
+        
+        if entry is None:
+            self._count('misses')
+            return None
+        
+        self._count('store_hits')
+        remaining = (entry.expires_at - datetime.utcnow()).total_seconds()
+        self.local.set(key, entry.payload, ttl=max(remaining, 1))
+        return entry.payload
+
+    def set(self, key, endpoint, payload):
+        if not self.enabled():
+            return
+        ttl = current_app.config.get('AI_CACHE_TTL', 3600)
+        self.local.set(key, payload, ttl=ttl)
+        try:
+            AICacheEntry(
+                key=key,
+                endpoint=endpoint,
+                payload=payload,
+                expires_at=datetime.utcnow() + timedelta(seconds=ttl)
+            ).save()
+        except Exception as e:
+            print(f"AI cache write failed: {str(e)}")
+            self._count('store_errors')
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+        lookups = counters['local_hits'] + counters['store_hits'] + counters['misses']
+        hits = counters['local_hits'] + counters['store_hits']
+        counters['hit_rate'] = round(hits / lookups, 4) if lookups else 0.0
+        counters['local'] = self.local.stats()
+        return counters
+
+
+ai_cache = AIResponseCache()
@@ -0,0 +1,236 @@
+import codecs
+import csv
+import json
+from datetime import datetime
+from mongoengine.errors import ValidationError
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from .catalog_cache import product_catalog
+from . import category_stats
+from ..models.product import Product
+
+IMPORT_FIELDS = ('sku', 'name', 'description', 'category', 'price', 'stock', 'image_url', 'is_active')
+
+# Applied with $setOnInsert so re-importing a partial row never resets them
+INSERT_DEFAULTS = {
+    'description': '',
+    'category': 'general',
+    'stock': 0,
+    'image_url': '',
+    'is_active': True
+}
+
+
+def to_bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes', 'on')
+    return bool(value)
+
+
+CONVERTERS = {
+    'price': float,
+    'stock': int,
+    'is_active': to_bool,
+}
+
+
+def iter_lines(stream):
+    """Decode a binary upload line by line; a line that isn't UTF-8 yields the error instead"""
+    for number, raw in enumerate(stream, 1):
+        if number == 1 and raw.startswith(codecs.BOM_UTF8):
+            raw = raw[len(codecs.BOM_UTF8):]
+        try:
+            yield raw.decode('utf-8')
+        except UnicodeDecodeError as e:
+            yield ValueError(f'Invalid UTF-8: {e}')
+
+
+def iter_ndjson(lines):
+    """Yield (line number, row) pairs; unparsable lines yield the error instead of a row"""
+    for number, line in enumerate(lines, 1):
+        if isinstance(line, Exception):
+            yield number, line
+            continue
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield number, ValueError(f'Invalid JSON: {e}')
+            continue
+        if not isinstance(row, dict):
+            yield number, ValueError('Each line must be a JSON object')
+            continue
+        yield number, row
+
+
+def strict_lines(lines):
+    """Pass decoded lines through, raising on the first one that failed to decode"""
+    for line in lines:
+        if isinstance(line, Exception):
+            raise line
+        yield line
+
+
+def iter_csv(lines):
+    """
+    Yield (row number, row) pairs; the header line is not counted.
+
+    A quoted CSV field may span lines, so an undecodable line can't be
+    skipped on its own and ends the import instead.
+    """
+    for number, row in enumerate(csv.DictReader(strict_lines(lines)), 1):
+        yield number, row
+
+
+def iter_rows(stream, import_format):
+    """Decode a binary upload line by line so only one row is held in memory"""
+    lines = iter_lines(stream)
+    if import_format == 'csv':
+        return iter_csv(lines)
+    return iter_ndjson(lines)
+
+
+def build_upsert(row):
+    """
+    Validate one row against the Product schema.
+
+    Returns (key, update) where key is ('sku', value) when the row has a SKU
+    and ('name', value) otherwise. Only the fields present in the row are
+    $set; the rest get their defaults on insert.
+    """
+    data = {}
+    for field in IMPORT_FIELDS:
+        value = row.get(field)
+        if value is None or value == '':
+            continue
+        try:
+            data[field] = CONVERTERS.get(field, str)(value)
+        except (TypeError, ValueError):
+            raise ValueError(f'Invalid value for {field}: {value!r}')
+    
+    if 'name' not in data or 'price' not in data:
+        raise ValueError('name and price are required')
+    
+    product = Product(**dict(INSERT_DEFAULTS, **data))
+    product.validate()
+    mongo = product.to_mongo()
+    
+    now = datetime.utcnow()
+    update = {
+        '$set': dict({field: mongo[field] for field in data}, updated_at=now),
+        '$setOnInsert': dict(
+            {field: mongo[field] for field in INSERT_DEFAULTS if field not in data},
+            created_at=now
+        )
+    }
+    key = ('sku', data['sku']) if 'sku' in data else ('name', data['name'])
+    return key, update
+
+
+class ProductImport:
+    """
+    Upsert a stream of product rows with unordered bulk writes.
+
+    Rows are buffered up to ``batch_size`` at a time and keyed by SKU or
+    name, so a later row for the same key replaces an earlier one in the
+    same batch. A row without a SKU only updates a product when exactly one
+    has its name; it is inserted when none does and rejected when several
+    do. run() is a generator of report lines: one per rejected row, then a
+    summary. An error that stops the import is reported as a final
+    ``{'error': ...}`` line before the summary.
+    """
+
+    def __init__(self, batch_size=1000):
+        self.batch_size = batch_size
+        self.counts = {'rows': 0, 'inserted': 0, 'matched': 0, 'modified': 0, 'failed': 0, 'skipped': 0}
+        self.categories = set()
+
+    def failure(self, number, message):
+        self.counts['failed'] += 1
+        return {'row': number, 'error': message}
+
+    def run(self, rows):
+        try:
+            yield from self.process(rows)
+        except Exception as e:
+            print(f"Error in product import: {str(e)}")
+            yield {'error': f'Import stopped: {e}'}
+        finally:
+            # Also runs when the client disconnects and the generator is closed
+            self.refresh_stats()
+        yield {'summary': self.counts}
+
+    def refresh_stats(self):
+        self.categories.discard(None)
+        if self.categories:
+            category_stats.rebuild(self.categories)
+
+    def process(self, rows):
+        batch = {}
+        for number, row in rows:
+            self.counts['rows'] += 1
+            if isinstance(row, Exception):
+                yield self.failure(number, str(row))
+                continue
+            try:
+                key, update = build_upsert(row)
+            except (ValueError, ValidationError) as e:
+                yield self.failure(number, str(e))
+                continue
+            
+            if key in batch:
+                self.counts['skipped'] += 1
+                yield {'row': batch[key][0], 'skipped': f'superseded by row {number}'}
+            batch[key] = (number, update)
+            
+            if len(batch) >= self.batch_size:
+                yield from self.flush(batch)
+                batch = {}
+        
+        if batch:
+            yield from self.flush(batch)
+
+    def flush(self, batch):
+        collection = Product._get_collection()
+        
+        # Remember the categories these rows leave, so their stats are refreshed too
+        skus = [value for (field, value) in batch if field == 'sku']
+        names = [value for (field, value) in batch if field == 'name']
+        existing = collection.find({'$or': [{'sku': {'$in': skus}}, {'name': {'$in': names}}]},
+                                   {'name': 1, 'sku': 1, 'category': 1})
+        by_name = {}
+        for doc in existing:
+            self.categories.add(doc.get('category'))
+            if doc['name'] in names:
+                by_name.setdefault(doc['name'], []).append(doc['_id'])
+        
+        numbers, requests = [], []
+        for (field, value), (number, update) in batch.items():
+            selector = {field: value}
+            if field == 'name':
+                matches = by_name.get(value, [])
+                if len(matches) > 1:
+                    yield self.failure(number, f'{len(matches)} products are named {value!r}; add a sku to pick one')
+                    continue
+                if matches:
+                    selector = {'_id': matches[0]}
+            self.categories.add(update['$set'].get('category') or update['$setOnInsert'].get('category'))
+            numbers.append(number)
+            requests.append(UpdateOne(selector, update, upsert=True))
+        if not requests:
+            return
+        
+        try:
+            result = collection.bulk_write(requests, ordered=False).bulk_api_result
+        except BulkWriteError as e:
+            result = e.details
+            for error in result.get('writeErrors', []):
+                number = numbers[error['index']]
+                yield self.failure(number, error.get('errmsg', 'Write failed'))
+        
+        self.counts['inserted'] += result.get('nUpserted', 0)
+        self.counts['matched'] += result.get('nMatched', 0)
+        self.counts['modified'] += result.get('nModified', 0)
+        product_catalog.bump()
@@ -0,0 +1,173 @@
+from bson import ObjectId
+from mongoengine.errors import ValidationError
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from .catalog_cache import product_catalog
+from . import category_stats
+from ..models.product import Product
+
+SETTABLE_FIELDS = ('sku', 'name', 'description', 'category', 'price', 'stock', 'image_url', 'is_active')
+INCREMENTABLE_FIELDS = {'stock': int, 'price': float}
+STATS_FIELDS = {'category', 'price', 'stock', 'is_active'}
+
+
+class PatchError(ValueError):
+    """Raised for an operation that is rejected before it reaches Mongo"""
+
+
+def build_set(values):
+    if not isinstance(values, dict):
+        raise PatchError('set must be an object')
+    update = {}
+    for name, value in values.items():
+        if name not in SETTABLE_FIELDS:
+            raise PatchError(f'Field {name} cannot be set')
+        field = Product._fields[name]
+        value = field.to_python(value) if value is not None else None
+        if value is None:
+            if field.required:
+                raise PatchError(f'Field {name} is required')
+        else:
+            field.validate(value)
+            value = field.to_mongo(value)
+        update[field.db_field] = value
+    return update
+
+
+def build_inc(values):
+    if not isinstance(values, dict):
+        raise PatchError('inc must be an object')
+    update = {}
+    for name, value in values.items():
+        if name not in INCREMENTABLE_FIELDS:
+            raise PatchError(f'Field {name} cannot be incremented')
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise PatchError(f'inc.{name} must be a number')
+        value = INCREMENTABLE_FIELDS[name](value)
+        if name == 'price':
+            # Prices are stored to the cent, so an increment must be whole cents too
+            if abs(value * 100 - round(value * 100)) > 1e-6:
+                raise PatchError('inc.price must have at most 2 decimal places')
+            value = round(value, 2)
+        update[name] = value
+    return update
+
+
+def build_operation(op):
+    """
+    Turn one {id, set, inc} item into a (selector, update) pair.
+
+    A negative stock or price increment only matches while the result stays
+    at or above zero, so concurrent decrements can never drive it negative.
+    """
+    if not isinstance(op, dict):
+        raise PatchError('Each operation must be an object')
+    if not ObjectId.is_valid(str(op.get('id', ''))):
+        raise PatchError('A valid id is required')
+    set_values = build_set(op.get('set') or {})
+    inc_values = build_inc(op.get('inc') or {})
+    if not set_values and not inc_values:
+        raise PatchError('Nothing to update')
+    overlap = set(set_values) & set(inc_values)
+    if overlap:
+        raise PatchError(f'Fields both set and incremented: {", ".join(sorted(overlap))}')
+    
+    selector = {'_id': ObjectId(op['id'])}
+    for name, value in inc_values.items():
+        if value < 0:
+            selector[name] = {'$gte': -value}
+    
+    update = {'$currentDate': {'updated_at': True}}
+    if set_values:
+        update['$set'] = set_values
+    if inc_values:
+        update['$inc'] = inc_values
+    return selector, update
+
+
+def snapshot(doc):
+    """category_stats.snapshot() for a raw document"""
+    return {
+        'category': doc.get('category'),
+        'price': float(doc['price']) if doc.get('price') is not None else 0.0,
+        'stock': doc.get('stock') or 0,
+        'is_active': bool(doc.get('is_active'))
+    }
+
+
+def apply_update(before, update):
+    """Compute the stats snapshot a matched update leaves behind"""
+    after = dict(before)
+    for name, value in update.get('$set', {}).items():
+        if name in after:
+            after[name] = value
+    for name, value in update.get('$inc', {}).items():
+        after[name] = round(after[name] + value, 2) if name == 'price' else after[name] + value
+    return after
+
+
+def patch_products(operations):
+    """
+    Apply many targeted $set/$inc updates with one unordered bulk_write.
+
+    Bulk results only report totals, so every update also sets a marker
+    unique to this request; one $in query for that marker afterwards tells
+    which items matched. updated_at is set by the server and always
+    changes, so a matched item is also a modified one. The stats fields of
+    the touched products are read in one batch before the write and folded
+    into category_stats with one bulk update. Returns one result per input
+    operation.
+    """
+    results = [None] * len(operations)
+    marker = ObjectId()
+    pending = []
+    seen = set()
+    for index, op in enumerate(operations):
+        try:
+            selector, update = build_operation(op)
+            if selector['_id'] in seen:
+                raise PatchError('Duplicate id in request')
+            seen.add(selector['_id'])
+            update.setdefault('$set', {})['_patch'] = marker
+            pending.append((index, selector, update))
+        except (PatchError, ValidationError, ValueError, TypeError) as e:
+            results[index] = {'id': op.get('id') if isinstance(op, dict) else None,
+                              'matched': 0, 'modified': 0, 'error': str(e)}
+    if not pending:
+        return results
+    
+    collection = Product._get_collection()
+    stats_ids = [selector['_id'] for _, selector, update in pending
+                 if STATS_FIELDS & (set(update['$set']) | set(update.get('$inc', {})))]
+    before = {}
+    if stats_ids:
+        before = {doc['_id']: snapshot(doc) for doc in
+                  collection.find({'_id': {'$in': stats_ids}}, dict.fromkeys(STATS_FIELDS, 1))}
+    
+    failed = {}
+    try:
+        collection.bulk_write([UpdateOne(selector, update) for _, selector, update in pending], ordered=False)
+    except BulkWriteError as e:
+        for error in e.details.get('writeErrors', []):
+            failed[error['index']] = error.get('errmsg', 'Write failed')
+    
+    ids = [selector['_id'] for _, selector, _ in pending]
+    written = {doc['_id'] for doc in collection.find({'_id': {'$in': ids}, '_patch': marker}, {'_id': 1})}
+    
+    changes = []
+    for position, (index, selector, update) in enumerate(pending):
+        object_id = selector['_id']
+        matched = int(object_id in written)
+        result = {'id': str(object_id), 'matched': matched, 'modified': matched}
+        if position in failed:
+            result['error'] = failed[position]
+        elif not matched:
+            result['error'] = 'Product not found or increment would go below zero'
+        elif object_id in before:
+            changes.append((before[object_id], apply_update(before[object_id], update)))
+        results[index] = result
+    
+    if written:
+        product_catalog.bump()
+        category_stats.record_changes(changes)
+    return results
@@ -0,0 +1,210 @@
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from functools import wraps
+from flask import request, current_app, make_response
+from pymongo import ReturnDocument
+from .cache import LRUCache
+from ..models.catalog import CatalogVersion
+
+
+class CatalogVersionTracker:
+    """
+    Per-worker view of the catalog version stored in Mongo.
+
+    Writes bump the shared counter atomically; reads use the locally known
+    version and only re-read Mongo once CATALOG_VERSION_TTL seconds have
+    passed, so other workers' writes are picked up within that window.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.version = None
+        self.updated_at = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _store(self, doc):
+        if doc is not None:
+            self.version = doc.version
+            self.updated_at = doc.updated_at
+        else:
+            self.version = 0
+            self.updated_at = datetime.utcnow().replace(microsecond=0)
+        self._checked_at = time.monotonic()
+
+    def current(self):
+        """Return (version, updated_at), refreshing from Mongo when stale"""
+        ttl = current_app.config.get('CATALOG_VERSION_TTL', 1.0)
+        if self.version is None or time.monotonic() - self._checked_at >= ttl:
+            with self._lock:
+                if self.version is None or time.monotonic() - self._checked_at >= ttl:
+                    self._store(CatalogVersion.objects(name=self.name).first())
+        return self.version, self.updated_at
+
+    def bump(self):
+        """Atomically increment the version after a catalog write"""
+        doc = CatalogVersion.objects(name=self.name).modify(
+            upsert=True,
+            new=True,
+            inc__version=1,
+            set__updated_at=datetime.utcnow().replace(microsecond=0)
+        )
+        with self._lock:
+            self._store(doc)
+        return self.version
+
+
+# How many recent stock changes a worker can catch up on without a full flush
+STOCK_CHANGES_KEPT = 1000
+
+
+class StockChangeTracker(CatalogVersionTracker):
+    """
+    Shared counter for live stock changes (reservations), kept apart from
+    the catalog version so a hold doesn't throw away every cached body.
+
+    Each bump also appends the product id to a capped list on the same
+    document. When a worker sees the counter move by n, the last n ids are
+    the products whose cached bodies it has to drop; if it fell further
+    behind than the list reaches, it drops everything.
+    """
+
+    def __init__(self, name, on_change):
+        super().__init__(name)
+        self.on_change = on_change
+
+    def _store(self, doc):
+        previous = self.version
+        super()._store(doc)
+        if previous is None or self.version == previous:
+            return
+        changed = doc.changed if doc is not None else []
+        missed = self.version - previous
+        self.on_change(changed[-missed:] if 0 < missed <= len(changed) else None)
+
+    def bump(self, product_id):
+        """Record a stock change of one product"""
+        raw = CatalogVersion._get_collection().find_one_and_update(
+            {'_id': self.name},
+            {
+                '$inc': {'version': 1},
+                '$push': {'changed': {'$each': [str(product_id)], '$slice': -STOCK_CHANGES_KEPT}},
+                '$set': {'updated_at': datetime.utcnow().replace(microsecond=0)}
+            },
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        with self._lock:
+            self._store(CatalogVersion._from_son(raw))
+        return self.version
+
+
+_response_cache = None
+
+
+def get_response_cache():
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = LRUCache(maxsize=current_app.config.get('CATALOG_CACHE_SIZE', 256))
+    return _response_cache
+
+
+def evict_stock_changes(product_ids):
+    """Drop cached bodies that show one of ``product_ids``, or all of them for None"""
+    if _response_cache is None:
+        return
+    if product_ids is None:
+        _response_cache.clear()
+        return
+    changed = set(product_ids)
+    _response_cache.evict(lambda entry: entry[1] is None or not changed.isdisjoint(entry[1]))
+
+
+product_catalog = CatalogVersionTracker('products')
+product_stock = StockChangeTracker('stock', evict_stock_changes)
+
+
+def listed_products(body, args):
+    """
+    Ids of the products a cached body shows, or None when any stock change
+    can alter it (facets, ?in_stock= filters).
+    """
+    if 'in_stock' in args:
+        return None
+    payload = json.loads(body)
+    if 'products' in payload:
+        return frozenset(product.get('id') for product in payload['products'])
+    if 'id' in payload:
+        return frozenset([payload['id']])
+    return None
+
+
+def make_etag(version, stock_version, key):
+    """Strong validator known before the view runs: shared counters plus the request key"""
+    digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()[:20]
+    return f'v{version}.{stock_version}-{digest}'
+
+
+def not_modified_since(updated_at):
+    since = request.if_modified_since
+    if since is None or updated_at is None:
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return updated_at.replace(tzinfo=timezone.utc, microsecond=0) <= since
+
+
+def catalog_cached(fn):
+    """
+    Serve a catalog read with a strong ETag and a pre-serialized body.
+
+    The ETag is built from the shared catalog and stock counters plus the
+    route and query args, so it is known before the view runs and is the
+    same in every worker: a matching If-None-Match (or If-Modified-Since)
+    is answered with 304 without rendering or touching Mongo, whether or
+    not this worker has the body cached. Both counters are re-read from
+    Mongo at most every CATALOG_VERSION_TTL seconds.
+
+    Bodies are kept in a bounded LRU keyed by (route, query args, catalog
+    version) and replayed until the next catalog write. Stock holds don't
+    bump the catalog version; they only evict the bodies that list the
+    held product, plus those whose content depends on stock as a whole
+    (see listed_products). Last-Modified is the later of the two counters.
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        version, updated_at = product_catalog.current()
+        stock_version, stock_updated_at = product_stock.current()
+        updated_at = max(filter(None, (updated_at, stock_updated_at)), default=None)
+        key = (request.path, tuple(sorted(request.args.items(multi=True))))
+        etag = make_etag(version, stock_version, key)
+        
+        if request.if_none_match:
+            # Weak comparison: compressed or re-encoded copies carry W/ tags
+            conditional_hit = request.if_none_match.contains_weak(etag)
+        else:
+            conditional_hit = not_modified_since(updated_at)
+        
+        if conditional_hit:
+            response = current_app.response_class(status=304, mimetype='application/json')
+        else:
+            cache = get_response_cache()
+            entry = cache.get(key + (version,))
+            if entry is None:
+                response = make_response(fn(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                body = response.get_data()
+                entry = (body, listed_products(body, request.args))
+                cache.set(key + (version,), entry)
+            response = current_app.response_class(entry[0], mimetype='application/json')
+        
+        response.set_etag(etag)
+        if updated_at is not None:
+            response.last_modified = updated_at
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    return wrapper
@@ -0,0 +1,223 @@
+from datetime import datetime
+from pymongo import UpdateOne
+from ..models.category_stats import CategoryStats
+from ..models.product import Product
+
+
+def snapshot(product):
+    """Capture the fields of a product that feed its category's stats"""
+    if product is None:
+        return None
+    return {
+        'category': product.category,
+        'price': float(product.price) if product.price is not None else 0.0,
+        'stock': product.stock or 0,
+        'is_active': bool(product.is_active)
+    }
+
+
+def counters(snap, sign=1):
+    return {
+        'product_count': sign,
+        'active_count': sign * int(snap['is_active']),
+        'in_stock_count': sign * int(snap['stock'] > 0),
+        'total_stock': sign * snap['stock']
+    }
+
+
+def price_bounds(category):
+    """Lowest and highest price in one category; served by the category+price index"""
+    prices = Product.objects(category=category).only('price').as_pymongo()
+    lowest = prices.order_by('price').first()
+    if lowest is None:
+        return None, None
+    return float(lowest['price']), float(prices.order_by('-price').first()['price'])
+
+
+def recompute_bounds(category, seen):
+    """
+    Tighten min/max price after a boundary product left ``seen`` (the stats doc
+    the caller got back).
+
+    Each bound is only replaced while it still holds the stale value, so a
+    concurrent $min/$max is never overwritten; a second read then folds in
+    anything written between the first read and the update.
+    """
+    collection = CategoryStats._get_collection()
+    lowest, highest = price_bounds(category)
+    if lowest is None:
+        collection.delete_one({'_id': category, 'product_count': {'$lte': 0}})
+        return
+    for field, value in (('min_price', lowest), ('max_price', highest)):
+        if seen.get(field) != value:
+            collection.update_one({'_id': category, field: seen.get(field)}, {'$set': {field: value}})
+    lowest, highest = price_bounds(category)
+    if lowest is not None:
+        collection.update_one({'_id': category}, {'$min': {'min_price': lowest}, '$max': {'max_price': highest}})
+
+
+def remove(snap):
+    """Take a product out of its category's stats"""
+    doc = CategoryStats._get_collection().find_one_and_update(
+        {'_id': snap['category']},
+        {'$inc': counters(snap, -1), '$set': {'updated_at': datetime.utcnow()}},
+        return_document=True
+    )
+    if doc is None:
+        return
+    if doc['product_count'] <= 0:
+        CategoryStats._get_collection().delete_one({'_id': snap['category'], 'product_count': {'$lte': 0}})
+    elif snap['price'] in (doc.get('min_price'), doc.get('max_price')):
+        # $min/$max can't be undone, so only a removed boundary costs a read
+        recompute_bounds(snap['category'], doc)
+
+
+def add(snap):
+    """Fold a product into its category's stats, creating the entry if needed"""
+    CategoryStats._get_collection().update_one(
+        {'_id': snap['category']},
+        {
+            '$inc': counters(snap),
+            '$min': {'min_price': snap['price']},
+            '$max': {'max_price': snap['price']},
+            '$set': {'updated_at': datetime.utcnow()}
+        },
+        upsert=True
+    )
+
+
+def adjust_stock(category, before, after):
+    """Apply a stock-only change with one $inc; no price bounds are involved"""
+    if before == after:
+        return
+    CategoryStats._get_collection().update_one(
+        {'_id': category},
+        {
+            '$inc': {
+                'total_stock': after - before,
+                'in_stock_count': int(after > 0) - int(before > 0)
+            },
+            '$set': {'updated_at': datetime.utcnow()}
+        }
+    )
+
+
+def move(before, after):
+    """Apply an update that stays in one category as a single delta"""
+    before_counts, after_counts = counters(before), counters(after)
+    delta = {field: after_counts[field] - before_counts[field] for field in after_counts}
+    doc = CategoryStats._get_collection().find_one_and_update(
+        {'_id': after['category']},
+        {
+            '$inc': delta,
+            '$min': {'min_price': after['price']},
+            '$max': {'max_price': after['price']},
+            '$set': {'updated_at': datetime.utcnow()}
+        },
+        return_document=True
+    )
+    if doc is not None and before['price'] != after['price'] and \
+            before['price'] in (doc.get('min_price'), doc.get('max_price')):
+        recompute_bounds(after['category'], doc)
+
+
+def record_change(before, after):
+    """
+    Apply a product write to category_stats.
+
+    ``before``/``after`` are snapshot() dicts; pass None for a create or a
+    delete. Every step is a single atomic update, so concurrent writers in
+    other workers never lose increments, and an update within one category
+    never takes its stats entry away.
+    """
+    if before == after:
+        return
+    if before is not None and after is not None and before['category'] == after['category']:
+        move(before, after)
+        return
+    if before is not None:
+        remove(before)
+    if after is not None:
+        add(after)
+
+
+def record_changes(changes):
+    """
+    Apply many (before, after) product writes, as for record_change().
+
+    Counter deltas are summed per category and sent as one unordered
+    bulk_write with a single $inc (plus $min/$max for incoming prices) per
+    category. Only categories that lost a boundary price or may have been
+    emptied are read back afterwards.
+    """
+    deltas, added, removed = {}, {}, {}
+    for before, after in changes:
+        if before == after:
+            continue
+        for snap, sign in ((before, -1), (after, 1)):
+            if snap is None:
+                continue
+            delta = deltas.setdefault(snap['category'], {})
+            for field, value in counters(snap, sign).items():
+                delta[field] = delta.get(field, 0) + value
+        if after is not None:
+            added.setdefault(after['category'], []).append(after['price'])
+        if before is not None and (after is None or (before['category'], before['price']) !=
+                                   (after['category'], after['price'])):
+            removed.setdefault(before['category'], set()).add(before['price'])
+    if not deltas:
+        return
+    
+    collection = CategoryStats._get_collection()
+    now = datetime.utcnow()
+    requests = []
+    for category, delta in deltas.items():
+        update = {'$inc': delta, '$set': {'updated_at': now}}
+        prices = added.get(category)
+        if prices:
+            update['$min'] = {'min_price': min(prices)}
+            update['$max'] = {'max_price': max(prices)}
+        requests.append(UpdateOne({'_id': category}, update, upsert=bool(prices)))
+    collection.bulk_write(requests, ordered=False)
+    
+    check = [category for category in deltas if category in removed or deltas[category]['product_count'] < 0]
+    if not check:
+        return
+    for doc in collection.find({'_id': {'$in': check}}):
+        if doc['product_count'] <= 0:
+            collection.delete_one({'_id': doc['_id'], 'product_count': {'$lte': 0}})
+        elif removed.get(doc['_id'], set()) & {doc.get('min_price'), doc.get('max_price')}:
+            recompute_bounds(doc['_id'], doc)
+
+
+def rebuild(categories=None):
+    """Recompute stats from the products collection, optionally for some categories only"""
+    scope = {} if categories is None else {'category': {'$in': list(categories)}}
+    pipeline = [{'$match': scope}, {'$group': {
+        '_id': '$category',
+        'product_count': {'$sum': 1},
+        'active_count': {'$sum': {'$cond': ['$is_active', 1, 0]}},
+        'in_stock_count': {'$sum': {'$cond': [{'$gt': ['$stock', 0]}, 1, 0]}},
+        'total_stock': {'$sum': '$stock'},
+        'min_price': {'$min': '$price'},
+        'max_price': {'$max': '$price'}
+    }}]
+    collection = CategoryStats._get_collection()
+    now = datetime.utcnow()
+    seen = []
+    for row in Product._get_collection().aggregate(pipeline):
+        category = row.pop('_id')
+        row['updated_at'] = now
+        collection.replace_one({'_id': category}, row, upsert=True)
+        seen.append(category)
+    stale = {'_id': {'$nin': seen}}
+    if categories is not None:
+        stale['_id']['$in'] = list(categories)
+    collection.delete_many(stale)
+    return len(seen)
+
+
+def stats_for(names):
+    """Return {category name: stats dict} with one batched lookup"""
+    found = {doc.category: doc.to_dict() for doc in CategoryStats.objects(category__in=list(names))}
+    return {name: found.get(name) or CategoryStats().to_dict() for name in names}
@@ -0,0 +1,82 @@
+import threading
+import time
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency while its breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    Errors and calls slower than ``slow_call_seconds`` count as failures.
+    After ``failure_threshold`` of them in a row the breaker opens and
+    rejects calls for ``reset_seconds``; then a single trial call is let
+    through (half-open) and its outcome closes or re-opens the breaker.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name, failure_threshold=5, slow_call_seconds=None, reset_seconds=30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def configure(self, failure_threshold=None, slow_call_seconds=None, reset_seconds=None):
+        if failure_threshold is not None:
+            self.failure_threshold = failure_threshold
+        if slow_call_seconds is not None:
+            self.slow_call_seconds = slow_call_seconds
+        if reset_seconds is not None:
+            self.reset_seconds = reset_seconds
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a call may go through now"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+            raise CircuitOpenError(f'{self.name} circuit is open')
+
+    def record(self, duration=None, error=None):
+        slow = (self.slow_call_seconds and duration is not None and duration >= self.slow_call_seconds)
+        with self._lock:
+            if error is None and not slow:
+                self.state = self.CLOSED
+                self.failures = 0
+                self._trial_in_flight = False
+                return
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+    def call(self, fn, *args, **kwargs):
+        self.before_call()
+        start = time.monotonic()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self.record(time.monotonic() - start, e)
+            raise
+        self.record(time.monotonic() - start)
+        return result
+
+    def stats(self):
+        with self._lock:
+            return {'name': self.name, 'state': self.state, 'consecutive_failures': self.failures}
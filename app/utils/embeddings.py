@@ -0,0 +1,72 @@
+import hashlib
+import numpy as np
+from .ranking import tokenize
+
+
+class HashingEmbedder:
+    """
+    Deterministic feature-hashing embedder.
+
+    Unigrams and adjacent-word bigrams are hashed into a fixed number of
+    signed buckets and the result is L2-normalized. It needs no network
+    and gives the same vectors in every process, which makes it suitable
+    for offline tests and as a zero-cost default.
+    """
+
+    def __init__(self, dim=512):
+        self.dim = dim
+        self.signature = f'hashing:{dim}'
+
+    def _bucket(self, feature):
+        digest = hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest()
+        value = int.from_bytes(digest, 'little')
+        return value % self.dim, 1.0 if value >> 63 else -1.0
+
+    def embed_one(self, text):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        tokens = tokenize(text)
+        features = tokens + [f'{a}_{b}' for a, b in zip(tokens, tokens[1:])]
+        for feature in features:
+            index, sign = self._bucket(feature)
+            vector[index] += sign
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def embed(self, texts):
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.vstack([self.embed_one(text) for text in texts])
+
+
+class OpenAIEmbedder:
+    """Embeddings from an OpenAI-compatible /embeddings endpoint."""
+
+    def __init__(self, client, model, dim=None):
+        self.client = client
+        self.model = model
+        self.dim = dim
+        self.signature = f'openai:{model}'
+
+    def embed(self, texts):
+        if not texts:
+            return np.zeros((0, self.dim or 0), dtype=np.float32)
+        response = self.client.embeddings.create(model=self.model, input=list(texts))
+        matrix = np.array([item.embedding for item in response.data], dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self.dim = matrix.shape[1]
+        return matrix / norms
+
+    def embed_one(self, text):
+        return self.embed([text])[0]
+
+
+def create_embedder(config):
+    """Build the embedder selected by EMBEDDING_PROVIDER"""
+    provider = config.get('EMBEDDING_PROVIDER', 'hashing')
+    if provider == 'hashing':
+        return HashingEmbedder(config.get('EMBEDDING_DIM', 512))
+    if provider == 'openai':
+        from ..controllers.ai_controller import get_client
+        return OpenAIEmbedder(get_client(), config.get('EMBEDDING_MODEL', 'openai/text-embedding-3-small'))
+    raise ValueError(f'Unknown embedding provider: {provider}')
@@ -0,0 +1,32 @@
+from .serializers import InvalidFields, parse_fields, serialize_category, serialize_queryset
+from ..models.category import Category
+
+EXPANDABLE = ('category',)
+
+
+def parse_expand(value):
+    """Validate an ?expand= argument and return the requested relations."""
+    requested = parse_fields(value)
+    unknown = requested - set(EXPANDABLE)
+    if unknown:
+        raise InvalidFields(f"Cannot expand: {', '.join(sorted(unknown))}")
+    return requested
+
+
+def expand_categories(products):
+    """
+    Replace each product's category name with its Category document.
+
+    All categories on the page are fetched with a single $in query. Names
+    that have no active Category document expand to ``{'name': name}``.
+    """
+    names = {product['category'] for product in products if product.get('category')}
+    if not names:
+        return products
+    categories = Category.objects(name__in=list(names), is_active=True)
+    by_name = {category['name']: category for category in serialize_queryset(categories, serialize_category)}
+    for product in products:
+        name = product.get('category')
+        if name:
+            product['category'] = by_name.get(name) or {'name': name}
+    return products
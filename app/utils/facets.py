@@ -0,0 +1,85 @@
+from .serializers import to_price
+from ..models.product import Product
+
+MAX_PRICE_BUCKETS = 20
+
+# Each facet ignores its own filter so the sidebar still offers the
+# alternatives (e.g. other categories) for the current selection.
+FACET_FILTERS = {
+    'categories': ('category',),
+    'availability': ('in_stock',),
+    'price': ('min_price', 'max_price'),
+}
+
+
+def build_facet_pipeline(base_match, facet_matches, total_match, price_buckets):
+    """
+    Build one $facet aggregation for the product sidebar.
+
+    ``base_match`` holds the filters shared by every facet and runs first so
+    it can use an index; ``facet_matches`` maps a facet name to the extra
+    filters that facet applies on top, and ``total_match`` the extra filters
+    for the overall count.
+    """
+    def narrowed(extra, *stages):
+        return ([{'$match': extra}] if extra else []) + list(stages)
+
+    return [
+        {'$match': base_match},
+        {'$facet': {
+            'total': narrowed(total_match, {'$count': 'count'}),
+            'categories': narrowed(
+                facet_matches['categories'],
+                {'$group': {'_id': '$category', 'count': {'$sum': 1}}},
+                {'$sort': {'count': -1, '_id': 1}}
+            ),
+            'availability': narrowed(
+                facet_matches['availability'],
+                {'$group': {'_id': {'$gt': ['$stock', 0]}, 'count': {'$sum': 1}}}
+            ),
+            'price_range': narrowed(
+                facet_matches['price'],
+                {'$group': {'_id': None, 'min': {'$min': '$price'}, 'max': {'$max': '$price'}}}
+            ),
+            'price_histogram': narrowed(
+                facet_matches['price'],
+                {'$bucketAuto': {'groupBy': '$price', 'buckets': price_buckets}}
+            ),
+        }}
+    ]
+
+
+def format_facets(result):
+    """Shape the single $facet output document for the API"""
+    total = result['total'][0]['count'] if result['total'] else 0
+    availability = {bool(row['_id']): row['count'] for row in result['availability']}
+    price_range = result['price_range'][0] if result['price_range'] else {}
+    lowest, highest = price_range.get('min'), price_range.get('max')
+    return {
+        'total': total,
+        'categories': [
+            {'value': row['_id'], 'count': row['count']} for row in result['categories']
+        ],
+        'availability': {
+            'in_stock': availability.get(True, 0),
+            'out_of_stock': availability.get(False, 0)
+        },
+        'price': {
+            'min': to_price(lowest) if lowest is not None else None,
+            'max': to_price(highest) if highest is not None else None,
+            'buckets': [
+                {
+                    'min': to_price(row['_id']['min']),
+                    'max': to_price(row['_id']['max']),
+                    'count': row['count']
+                }
+                for row in result['price_histogram']
+            ]
+        }
+    }
+
+
+def compute_facets(base_match, facet_matches, total_match, price_buckets):
+    pipeline = build_facet_pipeline(base_match, facet_matches, total_match, price_buckets)
+    results = list(Product._get_collection().aggregate(pipeline))
+    return format_facets(results[0])
@@ -0,0 +1,147 @@
+import hashlib
+import os
+import re
+import tempfile
+
+CHUNK_SIZE = 64 * 1024
+
+# Leading bytes of each accepted image format -> (extension, mimetype)
+SIGNATURES = (
+    (b'\x89PNG\r\n\x1a\n', 'png', 'image/png'),
+    (b'\xff\xd8\xff', 'jpg', 'image/jpeg'),
+    (b'GIF87a', 'gif', 'image/gif'),
+    (b'GIF89a', 'gif', 'image/gif'),
+)
+EXTENSION_ALIASES = {'jpg': ('jpg', 'jpeg')}
+MIMETYPES = {extension: mimetype for _, extension, mimetype in SIGNATURES}
+
+SNIFF_BYTES = max(len(signature) for signature, _, _ in SIGNATURES)
+
+NAME_RE = re.compile(r'^([0-9a-f]{64})\.(png|jpg|gif)$')
+
+
+class ImageRejected(ValueError):
+    """Raised for an upload that is not an accepted image."""
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def sniff(head, allowed_extensions):
+    """Identify an image from its first bytes; the client's filename and type are ignored"""
+    for signature, extension, mimetype in SIGNATURES:
+        if head.startswith(signature):
+            if not set(EXTENSION_ALIASES.get(extension, (extension,))) & set(allowed_extensions):
+                break
+            return extension, mimetype
+    raise ImageRejected('Unsupported image type', 415)
+
+
+def image_path(upload_folder, digest, extension):
+    """Content-addressed location, sharded by hash prefix to keep directories small"""
+    return os.path.join(upload_folder, digest[:2], digest[2:4], f'{digest}.{extension}')
+
+
+def resolve(upload_folder, name):
+    """Map a public image name to (path, digest, mimetype), or None for anything else"""
+    match = NAME_RE.match(name)
+    if not match:
+        return None
+    digest, extension = match.groups()
+    return image_path(upload_folder, digest, extension), digest, MIMETYPES[extension]
+
+
+class ImageWriter:
+    """
+    Writable sink that hashes, sniffs and size-checks an upload while it
+    is written to a temporary file inside ``upload_folder``.
+
+    A bad type or an oversized body raises ImageRejected from write(), so
+    the rest of the upload is never stored. It can be handed to the
+    multipart parser as its stream_factory result, so form uploads are
+    written to disk once, as they arrive, like raw bodies.
+    """
+
+    def __init__(self, upload_folder, allowed_extensions, max_bytes):
+        self.upload_folder = upload_folder
+        self.allowed_extensions = allowed_extensions
+        self.max_bytes = max_bytes
+        self.hasher = hashlib.sha256()
+        self.size = 0
+        self.head = b''
+        self.kind = None
+        tmp_dir = os.path.join(upload_folder, 'tmp')
+        os.makedirs(tmp_dir, exist_ok=True)
+        fd, self.tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        self.out = os.fdopen(fd, 'wb')
+
+    def write(self, chunk):
+        if self.kind is None:
+            self.head += chunk[:SNIFF_BYTES - len(self.head)]
+            if len(self.head) >= SNIFF_BYTES:
+                self.kind = sniff(self.head, self.allowed_extensions)
+        self.size += len(chunk)
+        if self.max_bytes and self.size > self.max_bytes:
+            raise ImageRejected('Image is too large', 413)
+        self.hasher.update(chunk)
+        self.out.write(chunk)
+        return len(chunk)
+
+    def seek(self, offset, whence=0):
+        # The multipart parser rewinds finished files; nothing is read back
+        return 0
+
+    def commit(self):
+        """Move the finished upload to its SHA-256 address and describe it"""
+        self.out.close()
+        if self.kind is None:
+            if not self.head:
+                raise ImageRejected('Empty upload')
+            self.kind = sniff(self.head, self.allowed_extensions)
+        
+        extension, mimetype = self.kind
+        digest = self.hasher.hexdigest()
+        path = image_path(self.upload_folder, digest, extension)
+        existed = os.path.exists(path)
+        if existed:
+            os.remove(self.tmp_path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.chmod(self.tmp_path, 0o644)
+            os.replace(self.tmp_path, path)
+        return {
+            'name': f'{digest}.{extension}',
+            'digest': digest,
+            'size': self.size,
+            'mimetype': mimetype,
+            'deduplicated': existed
+        }
+
+    def discard(self):
+        self.out.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
+def store_image(stream, upload_folder, allowed_extensions, max_bytes):
+    """
+    Stream an upload to disk in CHUNK_SIZE pieces while hashing it.
+
+    The body goes to a temporary file inside ``upload_folder`` and is then
+    renamed to its SHA-256 address, so a file under its final name is
+    always complete. Identical images map to the same name and are stored
+    once. Returns a dict with name, digest, size, mimetype and whether the
+    image already existed.
+    """
+    writer = ImageWriter(upload_folder, allowed_extensions, max_bytes)
+    try:
+        while True:
+            chunk = stream.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            writer.write(chunk)
+        return writer.commit()
+    except BaseException:
+        writer.discard()
+        raise
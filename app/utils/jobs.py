@@ -0,0 +1,145 @@
+import os
+import socket
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+from mongoengine.queryset.visitor import Q
+from ..models.job import Job
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler when retrying the job cannot succeed."""
+
+
+class JobQueue:
+    """
+    Mongo-backed job queue.
+
+    Jobs are claimed with a single find-and-modify, so any number of runner
+    threads or processes can share the collection. A job whose runner died
+    is claimed again once JOB_VISIBILITY_TIMEOUT has passed; failures are
+    retried with exponential backoff until max_attempts is reached.
+    """
+
+    def __init__(self):
+        self.handlers = {}
+        self.periodic = []
+        self._periodic_lock = threading.Lock()
+        self._threads = []
+        self._stop = threading.Event()
+
+    def register(self, kind, handler):
+        """Register handler(payload) -> result dict for a job kind"""
+        self.handlers[kind] = handler
+
+    def schedule(self, task, interval_key, default_interval):
+        """
+        Run task() every <config[interval_key]> seconds from the runner loop.
+
+        Tasks must be safe to run from several processes at once; each
+        process runs a due task from one of its runner threads only.
+        """
+        self.periodic.append({'task': task, 'interval_key': interval_key,
+                              'default': default_interval, 'last_run': 0.0})
+
+    def run_periodic(self, config):
+        if not self._periodic_lock.acquire(blocking=False):
+            return
+        try:
+            for entry in self.periodic:
+                interval = config.get(entry['interval_key'], entry['default'])
+                if time.monotonic() - entry['last_run'] >= interval:
+                    entry['last_run'] = time.monotonic()
+                    entry['task']()
+        finally:
+            self._periodic_lock.release()
+
+    def enqueue(self, kind, payload, user_id=None, max_attempts=None):
+        from flask import current_app
+        if kind not in self.handlers:
+            raise ValueError(f'Unknown job kind: {kind}')
+        job = Job(
+            kind=kind,
+            payload=payload or {},
+            user_id=str(user_id) if user_id else None,
+            max_attempts=max_attempts or current_app.config.get('JOB_MAX_ATTEMPTS', 3)
+        )
+        job.save()
+        return job
+
+    def claim(self, worker_id, config):
+        now = datetime.utcnow()
+        stale_before = now - timedelta(seconds=config.get('JOB_VISIBILITY_TIMEOUT', 300))
+        return Job.objects(
+            Q(status='queued', run_after__lte=now) |
+            Q(status='running', locked_at__lt=stale_before)
+        ).order_by('run_after').modify(
+            new=True,
+            set__status='running',
+            set__locked_by=worker_id,
+            set__locked_at=now,
+            set__updated_at=now,
+            inc__attempts=1
+        )
+
+    def run_job(self, job, config):
+        now = datetime.utcnow()
+        retention = timedelta(seconds=config.get('JOB_RETENTION', 86400))
+        try:
+            handler = self.handlers.get(job.kind)
+            if handler is None:
+                raise PermanentJobError(f'No handler registered for {job.kind}')
+            result = handler(job.payload)
+        except Exception as e:
+            permanent = isinstance(e, PermanentJobError) or job.attempts >= job.max_attempts
+            if not permanent:
+                traceback.print_exc()
+            updates = {'set__error': str(e), 'set__updated_at': now, 'unset__locked_by': True,
+                       'unset__locked_at': True}
+            if permanent:
+                updates.update(set__status='failed', set__finished_at=now, set__expires_at=now + retention)
+            else:
+                delay = config.get('JOB_RETRY_BACKOFF', 5) * 2 ** (job.attempts - 1)
+                updates.update(set__status='queued', set__run_after=now + timedelta(seconds=delay))
+            Job.objects(id=job.id, locked_by=job.locked_by).update_one(**updates)
+            return
+        
+        Job.objects(id=job.id, locked_by=job.locked_by).update_one(
+            set__status='succeeded',
+            set__result=result or {},
+            unset__error=True,
+            set__updated_at=now,
+            set__finished_at=now,
+            set__expires_at=now + retention
+        )
+
+    def run_forever(self, app, worker_id=None, stop=None):
+        """Claim and run jobs until stop is set"""
+        worker_id = worker_id or f'{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}'
+        stop = stop or self._stop
+        poll_interval = app.config.get('JOB_POLL_INTERVAL', 1.0)
+        while not stop.is_set():
+            try:
+                with app.app_context():
+                    self.run_periodic(app.config)
+                    job = self.claim(worker_id, app.config)
+                    if job is not None:
+                        self.run_job(job, app.config)
+                        continue
+            except Exception:
+                traceback.print_exc()
+            stop.wait(poll_interval)
+
+    def start_threads(self, app, count):
+        """Run count daemon runner threads inside this process"""
+        for _ in range(count):
+            thread = threading.Thread(target=self.run_forever, args=(app,), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stop.set()
+
+
+job_queue = JobQueue()
@@ -0,0 +1,95 @@
+import base64
+import json
+from datetime import datetime
+from bson import ObjectId
+from mongoengine.queryset.visitor import Q
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor we did not issue."""
+
+
+def parse_limit(value, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """Clamp the ?limit= query argument to a sane page size."""
+    if value in (None, ''):
+        return default
+    limit = int(value)
+    if limit < 1:
+        raise ValueError('limit must be a positive integer')
+    return min(limit, maximum)
+
+
+def encode_cursor(created_at, object_id):
+    """Build an opaque cursor from the sort key of the last row on a page."""
+    payload = json.dumps({
+        'c': created_at.isoformat() if created_at else None,
+        'i': str(object_id)
+    }, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return the (created_at, ObjectId) pair stored in a cursor."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        created_at = datetime.fromisoformat(payload['c']) if payload.get('c') else None
+        object_id = ObjectId(payload['i'])
+    except Exception:
+        raise InvalidCursor('Invalid cursor')
+    return created_at, object_id
+
+
+def encode_score_cursor(score, object_id):
+    """Cursor for result sets ordered by (-score, -id), e.g. text search."""
+    payload = json.dumps({'s': score, 'i': str(object_id)}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_score_cursor(cursor):
+    """Return the (score, ObjectId) pair stored in a score cursor."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        score = float(payload['s'])
+        object_id = ObjectId(payload['i'])
+    except Exception:
+        raise InvalidCursor('Invalid cursor')
+    return score, object_id
+
+
+def keyset_page(queryset, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Fetch one page of a queryset ordered by (-created_at, -id).
+
+    Seeking past the last (created_at, id) pair instead of using skip() keeps
+    the cost of a page constant no matter how deep the client has paged.
+    Works with both Document and as_pymongo() querysets. Returns the rows
+    and the cursor for the next page (None at the end).
+    """
+    if cursor:
+        created_at, object_id = decode_cursor(cursor)
+        if created_at is None:
+            queryset = queryset.filter(created_at=None, id__lt=object_id)
+        else:
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at) |
+                Q(created_at=created_at, id__lt=object_id) |
+                Q(created_at=None)
+            )
+
+    # Fetch one extra row to know whether another page exists
+    rows = list(queryset.order_by('-created_at', '-id').limit(limit + 1))
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        if isinstance(last, dict):
+            # Raw rows from as_pymongo()
+            next_cursor = encode_cursor(last.get('created_at'), last['_id'])
+        else:
+            next_cursor = encode_cursor(last.created_at, last.id)
+    return rows, next_cursor
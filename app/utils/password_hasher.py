@@ -0,0 +1,111 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+import bcrypt
+from flask import current_app
+from werkzeug.security import generate_password_hash, check_password_hash, DEFAULT_PBKDF2_ITERATIONS
+
+DEFAULT_BCRYPT_ROUNDS = 12
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many hash operations are queued or one did not finish in time."""
+
+
+def normalize_method(method):
+    """Spell out the defaults of a configured method, as hash_method() reports them."""
+    parts = method.split(':')
+    if parts[0] == 'bcrypt' and len(parts) == 1:
+        return f'bcrypt:{DEFAULT_BCRYPT_ROUNDS}'
+    if parts[0] == 'pbkdf2' and len(parts) == 2:
+        return f'{method}:{DEFAULT_PBKDF2_ITERATIONS}'
+    return method
+
+
+def _hash(password, method):
+    method = normalize_method(method)
+    if method.startswith('bcrypt'):
+        rounds = int(method.split(':')[1])
+        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+    return generate_password_hash(password, method=method)
+
+
+def _verify(pwhash, password):
+    if pwhash.startswith('$2'):
+        return bcrypt.checkpw(password.encode('utf-8'), pwhash.encode('utf-8'))
+    return check_password_hash(pwhash, password)
+
+
+def hash_method(pwhash):
+    """Return the method string a stored hash was produced with."""
+    if pwhash.startswith('$2'):
+        # $2b$12$... -> bcrypt:12
+        return f"bcrypt:{int(pwhash.split('$')[2])}"
+    return pwhash.split('$', 1)[0]
+
+
+class PasswordHasher:
+    """
+    Runs password hashing in a small process pool.
+
+    PBKDF2/bcrypt are CPU bound and hold the GIL, so running them in request
+    threads stalls every other request on the worker. The pool is created
+    lazily per process (and recreated after a fork); once more than
+    PASSWORD_HASH_MAX_PENDING operations are in flight new ones are rejected
+    with PasswordHasherBusy instead of queueing without bound.
+    """
+
+    def __init__(self):
+        self._executor = None
+        self._pid = None
+        self._pending = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        config = current_app.config
+        workers = config.get('PASSWORD_HASH_WORKERS', 2)
+        if workers <= 0:
+            return None
+        if self._executor is None or self._pid != os.getpid():
+            with self._lock:
+                if self._executor is None or self._pid != os.getpid():
+                    self._executor = ProcessPoolExecutor(max_workers=workers)
+                    self._pending = threading.BoundedSemaphore(
+                        config.get('PASSWORD_HASH_MAX_PENDING', workers * 4))
+                    self._pid = os.getpid()
+        return self._executor
+
+    def _run(self, fn, *args):
+        executor = self._get_executor()
+        if executor is None:
+            return fn(*args)
+        pending = self._pending
+        if not pending.acquire(blocking=False):
+            raise PasswordHasherBusy('Authentication service is busy, please retry')
+        try:
+            future = executor.submit(fn, *args)
+        except Exception:
+            pending.release()
+            raise
+        # Free the slot when the pool finishes the work, not when we stop
+        # waiting for it, so timed-out jobs still count against the limit
+        future.add_done_callback(lambda _: pending.release())
+        try:
+            return future.result(timeout=current_app.config.get('PASSWORD_HASH_TIMEOUT', 10))
+        except FutureTimeoutError:
+            raise PasswordHasherBusy('Authentication service timed out, please retry')
+
+    def hash(self, password):
+        return self._run(_hash, password, current_app.config.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:260000'))
+
+    def verify(self, pwhash, password):
+        if not pwhash:
+            return False
+        return self._run(_verify, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        configured = current_app.config.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:260000')
+        return hash_method(pwhash) != normalize_method(configured)
+
+
+password_hasher = PasswordHasher()
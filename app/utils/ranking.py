@@ -0,0 +1,84 @@
+import math
+import re
+from collections import Counter
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+STOPWORDS = frozenset("""
+a an and are as at be but by for from i in is it me my of on or our show
+some something that the this to under over with want need looking find best
+""".split())
+
+# Matches in the name say more about a product than matches in its description
+FIELD_WEIGHTS = (('name', 3.0), ('category', 2.0), ('description', 1.0))
+
+
+def tokenize(text):
+    if not text:
+        return []
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def _get(item, field):
+    return item.get(field) if isinstance(item, dict) else getattr(item, field, None)
+
+
+class BM25Ranker:
+    """
+    Okapi BM25 over a small in-memory candidate set.
+
+    Each product becomes one weighted bag of words built from its name,
+    category and description. IDF is computed over the candidates only,
+    which is what matters when picking the best few out of them.
+    """
+
+    def __init__(self, items, k1=1.5, b=0.75, field_weights=FIELD_WEIGHTS):
+        self.items = list(items)
+        self.k1 = k1
+        self.b = b
+        self.doc_terms = []
+        self.doc_lengths = []
+        df = Counter()
+        for item in self.items:
+            terms = Counter()
+            for field, weight in field_weights:
+                for token in tokenize(_get(item, field)):
+                    terms[token] += weight
+            self.doc_terms.append(terms)
+            self.doc_lengths.append(sum(terms.values()))
+            df.update(terms.keys())
+        n = len(self.items)
+        self.avg_length = (sum(self.doc_lengths) / n) if n else 0.0
+        self.idf = {term: math.log(1 + (n - freq + 0.5) / (freq + 0.5)) for term, freq in df.items()}
+
+    def score(self, query_terms, index):
+        terms = self.doc_terms[index]
+        length_norm = 1 - self.b + self.b * (self.doc_lengths[index] / self.avg_length if self.avg_length else 0)
+        score = 0.0
+        for term in query_terms:
+            tf = terms.get(term)
+            if tf:
+                score += self.idf[term] * tf * (self.k1 + 1) / (tf + self.k1 * length_norm)
+        return score
+
+    def rank(self, query, top_k=None):
+        """
+        Return (item, score) pairs, best first.
+
+        With an empty query the original order is kept, so callers can rank
+        unconditionally.
+        """
+        query_terms = set(tokenize(query))
+        if not query_terms:
+            ranked = [(item, 0.0) for item in self.items]
+        else:
+            scored = [(self.score(query_terms, i), i) for i in range(len(self.items))]
+            # Stable on ties: earlier candidates (default ordering) win
+            scored.sort(key=lambda pair: (-pair[0], pair[1]))
+            ranked = [(self.items[i], s) for s, i in scored]
+        return ranked[:top_k] if top_k else ranked
+
+
+def rank_products(products, query, top_k=None):
+    """Rank products against a free-text query and return the top_k products"""
+    return [item for item, _ in BM25Ranker(products).rank(query, top_k)]
@@ -0,0 +1,152 @@
+from datetime import datetime, timedelta
+from bson import ObjectId
+from flask import current_app
+from pymongo import ReturnDocument
+from .catalog_cache import product_stock
+from .jobs import job_queue
+from . import category_stats
+from ..models.product import Product
+from ..models.reservation import Reservation
+
+
+class ReservationError(Exception):
+    """Rejected reservation operation; maps to an HTTP error"""
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def take_stock(product_id, quantity):
+    """Decrement stock only if enough is left; returns the updated product or None"""
+    return Product._get_collection().find_one_and_update(
+        {'_id': product_id, 'is_active': True, 'stock': {'$gte': quantity}},
+        {'$inc': {'stock': -quantity}},
+        projection={'stock': 1, 'category': 1},
+        return_document=ReturnDocument.AFTER
+    )
+
+
+def return_stock(product_id, quantity):
+    product = Product._get_collection().find_one_and_update(
+        {'_id': product_id},
+        {'$inc': {'stock': quantity}},
+        projection={'stock': 1, 'category': 1},
+        return_document=ReturnDocument.AFTER
+    )
+    if product is not None:
+        stock_changed(product, product['stock'] - quantity)
+
+
+def stock_changed(product, previous_stock):
+    # Holds are frequent, so they only evict cached reads showing this product
+    # instead of bumping the catalog version
+    category_stats.adjust_stock(product.get('category'), previous_stock, product['stock'])
+    product_stock.bump(product['_id'])
+
+
+def reserve(product_id, quantity, user_id):
+    """
+    Hold ``quantity`` units of a product for a user.
+
+    The stock check and decrement are one conditional find_one_and_update,
+    so concurrent reservations can never take more than is in stock.
+    """
+    if not ObjectId.is_valid(str(product_id)):
+        raise ReservationError('Invalid product ID')
+    max_quantity = current_app.config.get('RESERVATION_MAX_QUANTITY', 100)
+    if isinstance(quantity, bool) or not isinstance(quantity, int) or not 1 <= quantity <= max_quantity:
+        raise ReservationError(f'quantity must be an integer between 1 and {max_quantity}')
+    
+    product_id = ObjectId(product_id)
+    product = take_stock(product_id, quantity)
+    if product is None:
+        if Product.objects(id=product_id, is_active=True).only('id').first() is None:
+            raise ReservationError('Product not found', 404)
+        raise ReservationError('Insufficient stock', 409)
+    
+    now = datetime.utcnow()
+    ttl = timedelta(seconds=current_app.config.get('RESERVATION_TTL', 600))
+    retention = timedelta(seconds=current_app.config.get('RESERVATION_RETENTION', 86400))
+    reservation = Reservation(
+        product_id=product_id,
+        user_id=str(user_id),
+        quantity=quantity,
+        expires_at=now + ttl,
+        purge_at=now + ttl + retention
+    )
+    try:
+        reservation.save()
+    except Exception:
+        Product._get_collection().update_one({'_id': product_id}, {'$inc': {'stock': quantity}})
+        raise
+    stock_changed(product, product['stock'] + quantity)
+    return reservation
+
+
+def get_reservation(reservation_id, user_id, is_admin=False):
+    if not ObjectId.is_valid(str(reservation_id)):
+        raise ReservationError('Invalid reservation ID')
+    query = Reservation.objects(id=reservation_id)
+    if not is_admin:
+        query = query.filter(user_id=str(user_id))
+    reservation = query.first()
+    if reservation is None:
+        raise ReservationError('Reservation not found', 404)
+    return reservation
+
+
+def finish(reservation_id, user_id, is_admin, status, require_unexpired):
+    """Atomically move a pending reservation to ``status``"""
+    if not ObjectId.is_valid(str(reservation_id)):
+        raise ReservationError('Invalid reservation ID')
+    now = datetime.utcnow()
+    retention = timedelta(seconds=current_app.config.get('RESERVATION_RETENTION', 86400))
+    query = Reservation.objects(id=reservation_id, status='pending')
+    if require_unexpired:
+        query = query.filter(expires_at__gt=now)
+    if not is_admin:
+        query = query.filter(user_id=str(user_id))
+    reservation = query.modify(new=True, set__status=status, set__updated_at=now,
+                               set__purge_at=now + retention)
+    if reservation is None:
+        current = get_reservation(reservation_id, user_id, is_admin)
+        if current.status == 'pending':
+            raise ReservationError('Reservation has expired', 409)
+        raise ReservationError(f'Reservation is already {current.status}', 409)
+    return reservation
+
+
+def confirm(reservation_id, user_id, is_admin=False):
+    """Turn a live hold into a sale; the stock stays taken"""
+    return finish(reservation_id, user_id, is_admin, 'confirmed', require_unexpired=True)
+
+
+def release(reservation_id, user_id, is_admin=False):
+    """Give up a hold and put its units back in stock"""
+    reservation = finish(reservation_id, user_id, is_admin, 'released', require_unexpired=False)
+    return_stock(reservation.product_id, reservation.quantity)
+    return reservation
+
+
+def release_expired(limit=500):
+    """
+    Return the stock of pending holds past their deadline.
+
+    Each hold is claimed with a status-guarded modify, so a concurrent
+    release or another sweeper can never return the same units twice.
+    """
+    now = datetime.utcnow()
+    retention = timedelta(seconds=current_app.config.get('RESERVATION_RETENTION', 86400))
+    released = 0
+    while released < limit:
+        reservation = Reservation.objects(status='pending', expires_at__lte=now).modify(
+            new=True, set__status='expired', set__updated_at=now, set__purge_at=now + retention)
+        if reservation is None:
+            break
+        return_stock(reservation.product_id, reservation.quantity)
+        released += 1
+    return released
+
+
+job_queue.schedule(release_expired, 'RESERVATION_SWEEP_INTERVAL', 30)
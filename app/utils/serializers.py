@@ -0,0 +1,137 @@
+from decimal import Decimal, ROUND_HALF_UP
+from functools import lru_cache
+
+_CENTS = Decimal('0.01')
+
+
+def format_datetime(dt):
+    """Render a datetime the way the model to_dict() methods do."""
+    if dt is None:
+        return None
+    if isinstance(dt, str):
+        return dt
+    return dt.isoformat()
+
+
+def to_str(value):
+    return str(value)
+
+
+def to_price(value):
+    """Mirror DecimalField(precision=2).to_python() followed by float()."""
+    if not value:
+        return 0.0
+    return float(Decimal('%s' % value).quantize(_CENTS, rounding=ROUND_HALF_UP))
+
+
+def identity(value):
+    return value
+
+
+def compile_serializer(spec):
+    """
+    Build a serializer for raw pymongo documents.
+
+    ``spec`` is an ordered list of (output_key, mongo_key, default, converter)
+    tuples. The lookup table is frozen once at import so that serializing a
+    row is a single pass over a tuple, without building a Document first.
+    """
+    fields = tuple(
+        (key, source, default, converter or identity)
+        for key, source, default, converter in spec
+    )
+
+    def serialize(raw):
+        get = raw.get
+        return {key: convert(get(source, default)) for key, source, default, convert in fields}
+
+    serialize.projection = tuple(source for _, source, _, _ in fields)
+    serialize.spec = fields
+    serialize.keys = tuple(key for key, _, _, _ in fields)
+    return serialize
+
+
+serialize_product = compile_serializer([
+    ('id', '_id', None, to_str),
+    ('sku', 'sku', None, None),
+    ('name', 'name', None, None),
+    ('description', 'description', None, None),
+    ('category', 'category', None, None),
+    ('price', 'price', None, to_price),
+    ('stock', 'stock', 0, None),
+    ('image_url', 'image_url', None, None),
+    ('created_at', 'created_at', None, format_datetime),
+    ('updated_at', 'updated_at', None, format_datetime),
+    ('is_active', 'is_active', True, None),
+])
+
+serialize_category = compile_serializer([
+    ('id', '_id', None, to_str),
+    ('name', 'name', None, None),
+    ('description', 'description', None, None),
+    ('slug', 'slug', None, None),
+    ('image_url', 'image_url', None, None),
+    ('is_active', 'is_active', True, None),
+    ('created_at', 'created_at', None, format_datetime),
+    ('updated_at', 'updated_at', None, format_datetime),
+])
+
+serialize_user = compile_serializer([
+    ('id', '_id', None, to_str),
+    ('username', 'username', None, None),
+    ('email', 'email', None, None),
+    ('role', 'role', 'client', None),
+    ('created_at', 'created_at', None, format_datetime),
+    ('updated_at', 'updated_at', None, format_datetime),
+    ('is_active', 'is_active', True, None),
+])
+
+
+class InvalidFields(ValueError):
+    """Raised when ?fields= names a field the resource does not have."""
+
+
+def parse_fields(value):
+    """Split a ?fields=a,b,c argument into a set of names."""
+    if not value:
+        return set()
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+@lru_cache(maxsize=256)
+def _subset(serializer, keys):
+    return compile_serializer([entry for entry in serializer.spec if entry[0] in keys])
+
+
+def select_fields(serializer, fields, extra=()):
+    """
+    Narrow a serializer to a sparse fieldset such as ?fields=id,name,price.
+
+    The result's projection only covers the requested keys, so unused fields
+    are neither fetched from Mongo nor serialized. ``id`` is always kept;
+    names in ``extra`` are accepted but left for the caller to fill in.
+    Returns the full serializer when no fields are requested.
+    """
+    requested = parse_fields(fields) if isinstance(fields, str) else set(fields or ())
+    if not requested:
+        return serializer
+    unknown = requested - set(serializer.keys) - set(extra)
+    if unknown:
+        raise InvalidFields(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return _subset(serializer, frozenset(requested | {'id'}))
+
+
+def only_fields(serializer):
+    """Translate a serializer's mongo keys into QuerySet.only() field names."""
+    return ['id' if source == '_id' else source for source in serializer.projection]
+
+
+def serialize_queryset(queryset, serializer):
+    """Serialize a queryset through the raw pymongo fast path."""
+    return [serializer(raw) for raw in queryset.only(*only_fields(serializer)).as_pymongo()]
+
+
+def serialize_first(queryset, serializer):
+    """Serialize the first match of a queryset, or return None."""
+    raw = queryset.only(*only_fields(serializer)).as_pymongo().first()
+    return serializer(raw) if raw is not None else None
@@ -0,0 +1,62 @@
+import json
+from flask import request, Response, stream_with_context
+
+
+def wants_event_stream():
+    """True when the client opted into SSE via ?stream=1 or the Accept header"""
+    if request.args.get('stream', '').lower() in ('1', 'true', 'yes'):
+        return True
+    return request.accept_mimetypes.best == 'text/event-stream'
+
+
+def format_event(data, event=None):
+    lines = []
+    if event:
+        lines.append(f'event: {event}')
+    for line in json.dumps(data).splitlines() or ['']:
+        lines.append(f'data: {line}')
+    return '\n'.join(lines) + '\n\n'
+
+
+def iter_completion_deltas(completion):
+    """Yield the text deltas of a stream=True chat completion"""
+    for chunk in completion:
+        if not chunk.choices:
+            continue
+        content = chunk.choices[0].delta.content
+        if content:
+            yield content
+
+
+def stream_completion(create_deltas, initial_events=(), on_complete=None, on_error=None):
+    """
+    Build a text/event-stream response around a streamed chat completion.
+
+    ``initial_events`` are (event, data) pairs sent before the model is
+    called, ``create_deltas`` starts the request and returns an iterable of
+    text deltas, and ``on_complete(text)`` returns the payload of the final
+    ``done`` event. If the stream fails and ``on_error(exc)`` returns a
+    payload, it is sent as the ``done`` event instead of an ``error`` event.
+    """
+    def generate():
+        for event, data in initial_events:
+            yield format_event(data, event)
+        parts = []
+        try:
+            for content in create_deltas():
+                parts.append(content)
+                yield format_event({'content': content}, 'delta')
+        except Exception as e:
+            fallback = on_error(e) if on_error else None
+            if fallback is not None:
+                yield format_event(fallback, 'done')
+            else:
+                yield format_event({'error': str(e)}, 'error')
+            return
+        text = ''.join(parts)
+        yield format_event(on_complete(text) if on_complete else {'content': text}, 'done')
+
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
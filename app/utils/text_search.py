@@ -0,0 +1,171 @@
+import re
+import threading
+from collections import defaultdict
+from flask import current_app
+from .pagination import encode_score_cursor, decode_score_cursor
+from .serializers import serialize_product
+from .catalog_cache import product_catalog
+from .ranking import STOPWORDS
+from ..models.product import Product
+
+# Must match the weights of the text index declared on Product
+TEXT_WEIGHTS = {'name': 10, 'category': 5, 'description': 1}
+
+WORD_RE = re.compile(r'[a-z0-9]+')
+
+
+def uses_mongomock():
+    host = current_app.config.get('MONGODB_SETTINGS', {}).get('host', '')
+    return host.startswith('mongomock://')
+
+
+def stem(token):
+    """Very small English suffix stripper standing in for Mongo's stemmer"""
+    for suffix in ('ies', 'es', 's'):
+        if len(token) > len(suffix) + 2 and token.endswith(suffix):
+            return token[:-len(suffix)] + ('y' if suffix == 'ies' else '')
+    return token
+
+
+def text_terms(text):
+    return [stem(t) for t in WORD_RE.findall((text or '').lower()) if t not in STOPWORDS]
+
+
+def field_score(tokens, query_terms, weight):
+    """
+    MongoDB's per-field text score: repeated occurrences add geometrically
+    less (1, 1/2, 1/4, ...) and the sum is scaled by how much of the field
+    the term covers.
+    """
+    if not tokens:
+        return 0.0
+    counts = defaultdict(int)
+    for token in tokens:
+        counts[token] += 1
+    score = 0.0
+    for term in query_terms:
+        count = counts.get(term)
+        if count:
+            frequency = sum(1 / (2 ** i) for i in range(count))
+            coefficient = 0.5 * count / len(tokens) + 0.5
+            score += weight * frequency * coefficient
+    return score
+
+
+class InvertedIndex:
+    """
+    In-process fallback for $text search under mongomock.
+
+    Postings map each stemmed term to product ids; the index is rebuilt
+    whenever the catalog version changes, and scoring follows
+    field_score so results rank the same way as on a real server.
+    """
+
+    def __init__(self):
+        self.version = None
+        self.postings = {}
+        self.fields = {}
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        version, _ = product_catalog.current()
+        with self._lock:
+            if self.version == version:
+                return
+            postings = defaultdict(set)
+            fields = {}
+            for raw in Product.objects.only(*TEXT_WEIGHTS).as_pymongo():
+                product_id = raw['_id']
+                tokenized = {field: text_terms(raw.get(field)) for field in TEXT_WEIGHTS}
+                fields[product_id] = tokenized
+                for tokens in tokenized.values():
+                    for token in tokens:
+                        postings[token].add(product_id)
+            self.postings, self.fields, self.version = dict(postings), fields, version
+
+    def score(self, query):
+        """Return {product_id: score} for products matching any query term"""
+        self.refresh()
+        query_terms = set(text_terms(query))
+        candidates = set()
+        for term in query_terms:
+            candidates |= self.postings.get(term, set())
+        return {
+            product_id: sum(
+                field_score(self.fields[product_id][field], query_terms, weight)
+                for field, weight in TEXT_WEIGHTS.items()
+            )
+            for product_id in candidates
+        }
+
+
+fallback_index = InvertedIndex()
+
+
+def after_cursor(cursor):
+    if not cursor:
+        return None
+    return decode_score_cursor(cursor)
+
+
+def search_with_text_index(query, match, cursor, limit, serializer):
+    projection = {field: 1 for field in serializer.projection}
+    projection['score'] = 1
+    pipeline = [
+        {'$match': dict(match, **{'$text': {'$search': query}})},
+        {'$addFields': {'score': {'$meta': 'textScore'}}},
+    ]
+    position = after_cursor(cursor)
+    if position:
+        score, object_id = position
+        pipeline.append({'$match': {'$or': [
+            {'score': {'$lt': score}},
+            {'score': score, '_id': {'$lt': object_id}}
+        ]}})
+    pipeline += [
+        {'$sort': {'score': -1, '_id': -1}},
+        {'$limit': limit + 1},
+        {'$project': projection}
+    ]
+    return list(Product._get_collection().aggregate(pipeline))
+
+
+def search_with_fallback(query, match, cursor, limit, serializer):
+    scores = fallback_index.score(query)
+    if not scores:
+        return []
+    collection = Product._get_collection()
+    rows = list(collection.find(dict(match, _id={'$in': list(scores)}),
+                                {field: 1 for field in serializer.projection}))
+    for raw in rows:
+        raw['score'] = scores[raw['_id']]
+    rows.sort(key=lambda raw: (raw['score'], raw['_id']), reverse=True)
+    position = after_cursor(cursor)
+    if position:
+        score, object_id = position
+        rows = [r for r in rows if (r['score'], r['_id']) < (score, object_id)]
+    return rows[:limit + 1]
+
+
+def text_match(query):
+    """Raw filter restricting a products query to documents matching ``query``"""
+    if uses_mongomock():
+        return {'_id': {'$in': list(fallback_index.score(query))}}
+    return {'$text': {'$search': query}}
+
+
+def search_products(query, match, cursor=None, limit=20, serializer=serialize_product):
+    """
+    Full-text search over name, category and description.
+
+    ``match`` is a raw Mongo filter (e.g. from filter_products()._query).
+    Results are ordered by (-textScore, -id) and paged with an opaque
+    cursor. Returns (serialized products with 'score', next_cursor).
+    """
+    search = search_with_fallback if uses_mongomock() else search_with_text_index
+    rows = search(query, match, cursor, limit, serializer)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_score_cursor(rows[-1]['score'], rows[-1]['_id'])
+    return [dict(serializer(raw), score=round(raw['score'], 4)) for raw in rows], next_cursor
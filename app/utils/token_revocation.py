@@ -0,0 +1,67 @@
+import threading
+import time
+from datetime import timedelta
+from flask import current_app
+from ..models.token_revocation import TokenRevocation
+
+# min_version recorded for deleted users: rejects every token they hold
+REVOKE_ALL = 2 ** 31 - 1
+
+
+class RevocationSet:
+    """
+    Compact per-worker map of user id -> lowest accepted token_version.
+
+    Revocations are written to Mongo and applied locally at once; other
+    workers pick them up on the next incremental sync, which runs at most
+    every TOKEN_REVOCATION_SYNC_INTERVAL seconds. updated_at is stamped by
+    the Mongo server, and each sync re-reads TOKEN_REVOCATION_SYNC_OVERLAP
+    seconds before the newest stamp it has seen, so a write that commits
+    after a sync but carries an earlier stamp is still picked up.
+    Re-applying a record is harmless since versions only ever grow.
+    """
+
+    def __init__(self):
+        self._min_versions = {}
+        self._high_water = None
+        self._synced_at = None
+        self._lock = threading.Lock()
+
+    def sync(self, force=False):
+        interval = current_app.config.get('TOKEN_REVOCATION_SYNC_INTERVAL', 10)
+        now = time.monotonic()
+        if not force and self._synced_at is not None and now - self._synced_at < interval:
+            return
+        with self._lock:
+            if not force and self._synced_at is not None and now - self._synced_at < interval:
+                return
+            query = TokenRevocation.objects
+            if self._high_water is not None:
+                overlap = timedelta(seconds=current_app.config.get('TOKEN_REVOCATION_SYNC_OVERLAP', 60))
+                query = query(updated_at__gte=self._high_water - overlap)
+            for record in query.only('user_id', 'min_version', 'updated_at'):
+                self._min_versions[record.user_id] = max(
+                    record.min_version, self._min_versions.get(record.user_id, 0))
+                if self._high_water is None or record.updated_at > self._high_water:
+                    self._high_water = record.updated_at
+            self._synced_at = now
+
+    def revoke(self, user_id, min_version):
+        """Reject every token for user_id older than min_version"""
+        user_id = str(user_id)
+        # $max so a late, lower revocation never undoes a newer one
+        TokenRevocation._get_collection().update_one(
+            {'_id': user_id},
+            {'$max': {'min_version': min_version}, '$currentDate': {'updated_at': True}},
+            upsert=True
+        )
+        with self._lock:
+            self._min_versions[user_id] = max(min_version, self._min_versions.get(user_id, 0))
+
+    def is_revoked(self, jwt_payload):
+        self.sync()
+        user_id = jwt_payload.get(current_app.config.get('JWT_IDENTITY_CLAIM', 'sub'))
+        return jwt_payload.get('token_version', 0) < self._min_versions.get(user_id, 0)
+
+
+token_revocations = RevocationSet()
@@ -0,0 +1,276 @@
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+import numpy as np
+from flask import current_app
+from .embeddings import create_embedder
+from ..models.product import Product
+from ..models.product_tombstone import ProductTombstone, TOMBSTONE_RETENTION
+
+
+class VectorIndex:
+    """
+    Dense matrix of unit vectors with an id <-> row mapping.
+
+    Rows are kept contiguous (removal swaps the last row into the hole) so
+    a search is a single matrix-vector product plus argpartition.
+    """
+
+    def __init__(self, dim, capacity=1024):
+        self.dim = dim
+        self.matrix = np.zeros((capacity, dim), dtype=np.float32)
+        self.ids = []
+        self.rows = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _grow(self):
+        grown = np.zeros((max(1024, self.matrix.shape[0] * 2), self.dim), dtype=np.float32)
+        grown[:len(self.ids)] = self.matrix[:len(self.ids)]
+        self.matrix = grown
+
+    def upsert(self, item_id, vector):
+        row = self.rows.get(item_id)
+        if row is None:
+            if len(self.ids) == self.matrix.shape[0]:
+                self._grow()
+            row = len(self.ids)
+            self.ids.append(item_id)
+            self.rows[item_id] = row
+        self.matrix[row] = vector
+
+    def remove(self, item_id):
+        row = self.rows.pop(item_id, None)
+        if row is None:
+            return
+        last = len(self.ids) - 1
+        if row != last:
+            moved = self.ids[last]
+            self.matrix[row] = self.matrix[last]
+            self.ids[row] = moved
+            self.rows[moved] = row
+        self.ids.pop()
+
+    def search(self, vector, k):
+        """Return [(id, cosine score)] for the k nearest rows"""
+        count = len(self.ids)
+        if not count or k <= 0:
+            return []
+        scores = self.matrix[:count] @ vector
+        k = min(k, count)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.ids[i], float(scores[i])) for i in top]
+
+    def save(self, path, signature, synced_at):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp.npz'
+        np.savez(
+            tmp_path,
+            matrix=self.matrix[:len(self.ids)],
+            # Fixed-width strings so the snapshot loads without pickle
+            ids=np.array(self.ids, dtype=str),
+            signature=np.array(signature),
+            synced_at=np.array(synced_at.isoformat())
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, signature):
+        """Return (index, synced_at) from a snapshot, or (None, None) if unusable"""
+        if not os.path.exists(path):
+            return None, None
+        with np.load(path, allow_pickle=False) as data:
+            if str(data['signature']) != signature:
+                return None, None
+            matrix = data['matrix']
+            index = cls(matrix.shape[1], capacity=max(1024, matrix.shape[0]))
+            index.matrix[:matrix.shape[0]] = matrix
+            index.ids = [str(i) for i in data['ids']]
+            index.rows = {item_id: row for row, item_id in enumerate(index.ids)}
+            return index, datetime.fromisoformat(str(data['synced_at']))
+
+
+def product_text(name, description):
+    return f'{name or ""}. {description or ""}'
+
+
+class SemanticProductIndex:
+    """
+    Per-worker semantic index over active products.
+
+    Everything that embeds runs on one background thread per worker, never
+    inside a request: the thread warm starts from the snapshot at
+    SEMANTIC_INDEX_PATH (or builds the index from scratch), then embeds the
+    products this worker saves as they are queued and catches up on other
+    workers' changes every SEMANTIC_SYNC_INTERVAL seconds. search() returns
+    None until the first build has finished so callers can fall back to
+    keyword search. The sync only reads products updated (which covers
+    deactivation) and tombstones written since the previous one,
+    re-reading SEMANTIC_SYNC_OVERLAP seconds to allow for writes that
+    commit late or come from a worker with a skewed clock.
+    """
+
+    def __init__(self):
+        self.index = None
+        self.embedder = None
+        self.synced_at = None
+        self.ready = False
+        self._saved_at = 0.0
+        self._dirty = False
+        self._pending = set()
+        self._wake = threading.Event()
+        self._thread = None
+        self._lock = threading.RLock()
+
+    def start(self, app):
+        """Start the background builder for this process once"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, args=(app,), daemon=True,
+                                            name='semantic-index')
+            self._thread.start()
+
+    def _run(self, app):
+        with app.app_context():
+            try:
+                self._load()
+            except Exception as e:
+                # The next search starts a new attempt
+                print(f"Semantic index build failed: {str(e)}")
+                return
+            interval = app.config.get('SEMANTIC_SYNC_INTERVAL', 30)
+            next_sync = time.monotonic() + interval
+            while True:
+                self._wake.wait(max(0.0, next_sync - time.monotonic()))
+                self._wake.clear()
+                try:
+                    self._embed_pending()
+                    if time.monotonic() >= next_sync:
+                        started = datetime.utcnow()
+                        self._catch_up(self.synced_at)
+                        self.synced_at = started
+                        next_sync = time.monotonic() + interval
+                    self._save_if_due()
+                except Exception as e:
+                    # Queued ids are dropped; the next sync picks them up by updated_at
+                    print(f"Semantic index sync failed: {str(e)}")
+
+    def _embed_rows(self, rows):
+        texts = [product_text(r.get('name'), r.get('description')) for r in rows]
+        return self.embedder.embed(texts)
+
+    def _remove(self, item_id):
+        with self._lock:
+            if item_id in self.index.rows:
+                self.index.remove(item_id)
+                self._dirty = True
+
+    def _ingest(self, query, batch_size=500):
+        """Embed and upsert/remove the products matched by a raw query"""
+        batch = []
+        for raw in query.only('id', 'name', 'description', 'is_active').as_pymongo().batch_size(batch_size):
+            if raw.get('is_active', True):
+                batch.append(raw)
+            else:
+                self._remove(str(raw['_id']))
+            if len(batch) >= batch_size:
+                self._upsert_rows(batch)
+                batch = []
+        if batch:
+            self._upsert_rows(batch)
+
+    def _upsert_rows(self, rows):
+        vectors = self._embed_rows(rows)
+        with self._lock:
+            for raw, vector in zip(rows, vectors):
+                self.index.upsert(str(raw['_id']), vector)
+            self._dirty = True
+
+    def _embed_pending(self):
+        with self._lock:
+            pending, self._pending = self._pending, set()
+        if pending:
+            self._ingest(Product.objects(id__in=list(pending)))
+
+    def _reconcile_deletions(self):
+        """Full scan of live ids; only for snapshots older than the tombstones"""
+        live = {str(raw['_id']) for raw in Product.objects(is_active=True).only('id').as_pymongo()}
+        for item_id in [i for i in self.index.ids if i not in live]:
+            self._remove(item_id)
+
+    def _catch_up(self, since):
+        """Apply updates and deletions made since ``since``"""
+        since = since - timedelta(seconds=current_app.config.get('SEMANTIC_SYNC_OVERLAP', 60))
+        self._ingest(Product.objects(updated_at__gte=since))
+        for tombstone in ProductTombstone.objects(deleted_at__gte=since).only('product_id'):
+            self._remove(tombstone.product_id)
+
+    def _load(self):
+        config = current_app.config
+        self.embedder = create_embedder(config)
+        path = config.get('SEMANTIC_INDEX_PATH')
+        started = datetime.utcnow()
+        index, synced_at = (None, None)
+        if path:
+            try:
+                index, synced_at = VectorIndex.load(path, self.embedder.signature)
+            except Exception as e:
+                print(f"Ignoring unreadable semantic index snapshot: {str(e)}")
+        if index is not None:
+            self.index = index
+            if started - synced_at > timedelta(seconds=TOMBSTONE_RETENTION):
+                self._ingest(Product.objects(updated_at__gte=synced_at))
+                self._reconcile_deletions()
+            else:
+                self._catch_up(synced_at)
+        else:
+            dim = getattr(self.embedder, 'dim', None) or self.embedder.embed_one('probe').shape[0]
+            self.index = VectorIndex(dim)
+            self._ingest(Product.objects(is_active=True))
+            self._dirty = True
+        self.synced_at = started
+        self.ready = True
+        self._save_if_due(force=True)
+
+    def _save_if_due(self, force=False):
+        path = current_app.config.get('SEMANTIC_INDEX_PATH')
+        interval = current_app.config.get('SEMANTIC_SNAPSHOT_INTERVAL', 300)
+        if not path or not self._dirty:
+            return
+        if not force and time.monotonic() - self._saved_at < interval:
+            return
+        try:
+            with self._lock:
+                self.index.save(path, self.embedder.signature, self.synced_at)
+                self._dirty = False
+            self._saved_at = time.monotonic()
+        except Exception as e:
+            print(f"Failed to save semantic index snapshot: {str(e)}")
+
+    def search(self, query, k):
+        """Return [(product id, score)], or None while the index is still being built"""
+        if not self.ready:
+            self.start(current_app._get_current_object())
+            return None
+        vector = self.embedder.embed_one(query)
+        with self._lock:
+            return self.index.search(vector, k)
+
+    def on_product_saved(self, product):
+        """Hook for create/update: queue the product for the background embedder"""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        with self._lock:
+            self._pending.add(str(product.id))
+        self._wake.set()
+
+    def on_product_deleted(self, product_id):
+        if self.ready:
+            self._remove(str(product_id))
+
+
+semantic_index = SemanticProductIndex()
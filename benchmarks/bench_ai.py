@@ -0,0 +1,132 @@
+"""
+Latency benchmark for the /api/ai/* routes against the local OpenAI stub.
+
+    python -m benchmarks.bench_ai [--requests 100] [--concurrency 8] \
+        [--products 2000] [--latency lognormal:-1.6,0.5] [--max-p95 2.0]
+
+The stub is started in-process and the app (TestingConfig, mongomock) is
+pointed at it through OPENAI_BASE_URL, so no network access or API quota
+is needed. The AI response cache is disabled so every request reaches the
+model. For each route it reports p50/p95/p99 latency, throughput, error
+count and the prompt sizes the stub received. With --max-p95 the run exits
+non-zero when any route is slower, which makes it usable as a CI gate.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.openai_stub import build_parser as stub_parser, start_server
+
+ROUTES = [
+    ('recommend', '/api/ai/recommend', lambda i: {'query': f'wireless headphones under ${100 + i % 400}'}),
+    ('recommend/category', '/api/ai/recommend/category', lambda i: {'category': f'category-{i % 10}'}),
+    ('recommend/price', '/api/ai/recommend/price', lambda i: {'min_price': i % 50, 'max_price': 200 + i % 300}),
+    ('generate/description', '/api/ai/generate/description',
+     lambda i: {'name': f'Gadget {i}', 'category': 'electronics', 'features': ['fast', 'light'], 'price': 99}),
+]
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def seed(app, count):
+    from flask_jwt_extended import create_access_token
+    from app.models.product import Product
+    from app.models.user import User
+
+    with app.app_context():
+        Product.objects.delete()
+        Product.objects.insert([Product(
+            name=f'Product {i}',
+            description=f'Wireless gadget number {i} with long battery life and solid build',
+            category=f'category-{i % 10}',
+            price=5 + (i % 500),
+            stock=i % 20
+        ) for i in range(count)], load_bulk=False)
+        user = User.objects(email='bench-ai@example.com').first()
+        if not user:
+            user = User(username='bench-ai', email='bench-ai@example.com', role='admin')
+            user.set_password('bench-password')
+            user.save()
+        return create_access_token(identity=str(user.id), additional_claims=user.token_claims())
+
+
+def stub_stats(base_url):
+    with urllib.request.urlopen(f'{base_url}/stats') as response:
+        return json.loads(response.read())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='AI route latency benchmark')
+    parser.add_argument('--requests', type=int, default=100, help='requests per route')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--products', type=int, default=2000)
+    parser.add_argument('--latency', default='lognormal:-1.6,0.5')
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--max-p95', type=float, default=None, help='fail if any route p95 exceeds this (s)')
+    args = parser.parse_args()
+
+    server, _ = start_server(stub_parser().parse_args(
+        ['--port', '0', '--latency', args.latency, '--error-rate', str(args.error_rate)]))
+    base_url = f'http://127.0.0.1:{server.server_address[1]}/v1'
+    from app import create_app
+    app = create_app('testing')
+    app.config['AI_CACHE_ENABLED'] = False
+    app.config['OPENAI_BASE_URL'] = base_url
+    app.config['OPENAI_API_KEY'] = app.config['OPENAI_API_KEY'] or 'stub'
+    token = seed(app, args.products)
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {token}'}
+
+    print(f"{'route':<22}{'ok':>6}{'err':>5}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+          f"{'req/s':>8}{'prompt tok avg':>16}{'max':>7}")
+    failed = False
+    for name, path, make_body in ROUTES:
+        before = stub_stats(base_url)
+        latencies, errors = [], 0
+
+        def call(i):
+            start = time.perf_counter()
+            response = client.post(path, json=make_body(i), headers=headers)
+            return time.perf_counter() - start, response.status_code
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            for elapsed, status in executor.map(call, range(args.requests)):
+                if status == 200:
+                    latencies.append(elapsed)
+                else:
+                    errors += 1
+        wall = time.perf_counter() - start
+
+        after = stub_stats(base_url)
+        calls = after['requests'] - before['requests']
+        prompt_avg = prompt_max = 0
+        if calls:
+            # Stats are cumulative; derive this route's share of the mean
+            prompt_avg = (after['prompt_tokens_est_mean'] * after['requests'] -
+                          before.get('prompt_tokens_est_mean', 0) * before['requests']) / calls
+            prompt_max = after['prompt_tokens_est_max']
+
+        if latencies:
+            p50, p95, p99 = (percentile(latencies, p) * 1000 for p in (50, 95, 99))
+        else:
+            p50 = p95 = p99 = float('nan')
+        print(f"{name:<22}{len(latencies):>6}{errors:>5}{p50:>9.1f}{p95:>9.1f}{p99:>9.1f}"
+              f"{args.requests / wall:>8.1f}{prompt_avg:>16.0f}{prompt_max:>7}")
+        if args.max_p95 is not None and (not latencies or p95 / 1000 > args.max_p95):
+            failed = True
+
+    server.shutdown()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
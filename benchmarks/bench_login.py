@@ -0,0 +1,87 @@
+"""
+Measure login throughput under concurrent load, with password hashing run
+inline in request threads versus in the bounded process pool.
+
+Run from the project root (uses TestingConfig, i.e. mongomock):
+
+    python -m benchmarks.bench_login [--requests 200] [--concurrency 16]
+
+Alongside the logins a background thread times a cheap catalog-style
+request loop, to show how much a login burst delays unrelated traffic.
+"""
+import argparse
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app import create_app
+from app.models.user import User
+
+EMAIL = 'bench@example.com'
+PASSWORD = 'bench-password'
+
+
+def build_app(workers):
+    app = create_app('testing')
+    app.config['PASSWORD_HASH_WORKERS'] = workers
+    app.config['PASSWORD_HASH_MAX_PENDING'] = 10 ** 6
+    with app.app_context():
+        if not User.objects(email=EMAIL).first():
+            user = User(username='bench', email=EMAIL)
+            user.set_password(PASSWORD)
+            user.save()
+    return app
+
+
+def probe_latency(app, stop, samples):
+    """Time a request that needs no hashing while logins are running"""
+    client = app.test_client()
+    while not stop.is_set():
+        start = time.perf_counter()
+        client.get('/api/categories')
+        samples.append(time.perf_counter() - start)
+
+
+def run(workers, total, concurrency):
+    app = build_app(workers)
+    client = app.test_client()
+    statuses = []
+
+    def login(_):
+        response = client.post('/api/auth/login', json={'email': EMAIL, 'password': PASSWORD})
+        statuses.append(response.status_code)
+
+    stop = threading.Event()
+    probe_samples = []
+    probe = threading.Thread(target=probe_latency, args=(app, stop, probe_samples))
+    probe.start()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(login, range(total)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    probe.join()
+
+    ok = statuses.count(200)
+    probe_p95 = statistics.quantiles(probe_samples, n=20)[18] * 1000 if len(probe_samples) > 1 else 0.0
+    label = 'inline' if workers <= 0 else f'pool({workers})'
+    print(f"{label:<10}{ok:>6}/{total:<6}{ok / elapsed:>12.1f}{probe_p95:>16.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--workers', type=int, nargs='*', default=[0, 2, 4])
+    args = parser.parse_args()
+
+    print(f"{'mode':<10}{'ok':>13}{'logins/s':>12}{'probe p95 ms':>16}")
+    for workers in args.workers:
+        run(workers, args.requests, args.concurrency)
+
+
+if __name__ == '__main__':
+    main()
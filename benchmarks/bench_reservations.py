@@ -0,0 +1,96 @@
+"""
+Stress the reservation engine with many threads racing for a small stock.
+
+Run from the project root against a real MongoDB (MONGO_URI, default
+mongodb://localhost:27017/ai_product_mgmt):
+
+    python -m benchmarks.bench_reservations [--stock 500] [--attempts 5000] [--concurrency 32]
+
+mongomock is refused: its find_one_and_update reads and then writes
+without holding a lock, so the stock guard is not atomic there and an
+oversell would say nothing about the real engine.
+
+Every thread calls reserve() directly, so the figures measure the
+conditional find_one_and_update path rather than HTTP overhead. The run
+fails with exit code 1 if more units were handed out than were in stock.
+"""
+import argparse
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app import create_app
+from app.models.product import Product
+from app.models.reservation import Reservation
+from app.utils import reservations
+from app.utils.reservations import ReservationError
+
+
+def run(config_name, stock, attempts, concurrency, max_quantity, release_ratio):
+    app = create_app(config_name)
+    host = app.config['MONGODB_SETTINGS'].get('host', '')
+    if host.startswith('mongomock://'):
+        raise SystemExit(f'{config_name} uses mongomock; point --config at a real MongoDB')
+    with app.app_context():
+        Product._get_db().command('ping')
+        product = Product(name='Flash sale item', description='bench', category='bench',
+                          price=9.99, stock=stock)
+        product.save()
+    product_id = str(product.id)
+
+    def attempt(index):
+        with app.app_context():
+            quantity = random.randint(1, max_quantity)
+            try:
+                reservation = reservations.reserve(product_id, quantity, f'user-{index}')
+            except ReservationError as e:
+                return 'rejected', 0, e.status_code
+            # Some buyers walk away, which puts stock back for the others
+            if random.random() < release_ratio:
+                reservations.release(reservation.id, f'user-{index}')
+                return 'released', 0, 200
+            reservations.confirm(reservation.id, f'user-{index}')
+            return 'confirmed', quantity, 200
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(attempt, range(attempts)))
+    elapsed = time.perf_counter() - start
+
+    with app.app_context():
+        final_stock = Product.objects(id=product_id).first().stock
+        confirmed_units = sum(r.quantity for r in Reservation.objects(product_id=product.id, status='confirmed'))
+        Reservation.objects(product_id=product.id).delete()
+        Product.objects(id=product_id).delete()
+
+    sold = sum(units for _, units, _ in outcomes)
+    counts = {kind: sum(1 for outcome, _, _ in outcomes if outcome == kind)
+              for kind in ('confirmed', 'released', 'rejected')}
+    oversold = final_stock < 0 or sold != confirmed_units or sold + final_stock != stock
+
+    print(f"attempts        {attempts} ({concurrency} threads)")
+    print(f"confirmed       {counts['confirmed']}  released {counts['released']}  rejected {counts['rejected']}")
+    print(f"units sold      {sold} of {stock}, final stock {final_stock}")
+    print(f"throughput      {attempts / elapsed:.1f} operations/s ({elapsed:.2f}s)")
+    print(f"oversold        {'YES' if oversold else 'no'}")
+    return not oversold
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--config', default='development')
+    parser.add_argument('--stock', type=int, default=500)
+    parser.add_argument('--attempts', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--max-quantity', type=int, default=3)
+    parser.add_argument('--release-ratio', type=float, default=0.2)
+    args = parser.parse_args()
+
+    ok = run(args.config, args.stock, args.attempts, args.concurrency,
+             args.max_quantity, args.release_ratio)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
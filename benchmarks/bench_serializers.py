@@ -0,0 +1,102 @@
+"""
+Compare the hydrated read path (Document + to_dict) with the raw pymongo
+serializers used by the list endpoints.
+
+Run from the project root:
+
+    python -m benchmarks.bench_serializers [sizes...]
+
+No database is needed: raw documents are built in memory and hydrated with
+``Document._from_son``, which is what a QuerySet does for every row.
+Category stats normally come from the category_stats collection; both paths
+are handed the same fixed stats so only serialization is compared.
+"""
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from bson import ObjectId
+
+from app.models.product import Product
+from app.models.category import Category
+from app.models.user import User
+from app.utils.serializers import serialize_product, serialize_category, serialize_user
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+STATS = {'product_count': 12, 'active_count': 10, 'in_stock_count': 9,
+         'total_stock': 140, 'min_price': 4.99, 'max_price': 129.0}
+
+
+def make_products(n):
+    now = datetime(2024, 1, 1, 12, 0, 0, 123000)
+    return [{
+        '_id': ObjectId(),
+        'name': f'Product {i}',
+        'description': 'A reasonably long product description ' * 4,
+        'category': f'category-{i % 20}',
+        'price': round(5 + (i % 997) * 1.37, 2),
+        'stock': i % 50,
+        'image_url': f'https://cdn.example.com/{i}.png' if i % 3 else None,
+        'created_at': now - timedelta(seconds=i),
+        'updated_at': now,
+        'is_active': bool(i % 7),
+    } for i in range(n)]
+
+
+def make_categories(n):
+    now = datetime(2024, 1, 1, 12, 0, 0)
+    return [{
+        '_id': ObjectId(),
+        'name': f'Category {i}',
+        'description': 'Category description',
+        'slug': f'category-{i}',
+        'image_url': f'https://cdn.example.com/c{i}.png',
+        'is_active': True,
+        'created_at': now,
+        'updated_at': now,
+    } for i in range(n)]
+
+
+def make_users(n):
+    now = datetime(2024, 1, 1, 12, 0, 0)
+    return [{
+        '_id': ObjectId(),
+        'username': f'user{i}',
+        'email': f'user{i}@example.com',
+        'password_hash': 'pbkdf2:sha256:260000$salt$hash',
+        'role': 'admin' if i % 50 == 0 else 'client',
+        'created_at': now,
+        'updated_at': now,
+        'is_active': True,
+    } for i in range(n)]
+
+
+def time_it(fn, rows):
+    start = time.perf_counter()
+    result = fn(rows)
+    return time.perf_counter() - start, result
+
+
+def run(sizes):
+    cases = [
+        ('Product', lambda r: Product._from_son(r).to_dict(), serialize_product, make_products),
+        ('Category', lambda r: Category._from_son(r).to_dict(stats=STATS),
+         lambda r: dict(serialize_category(r), stats=STATS), make_categories),
+        ('User', lambda r: User._from_son(r).to_dict(), serialize_user, make_users),
+    ]
+    print(f"{'model':<10}{'rows':>8}{'hydrated (s)':>15}{'raw (s)':>12}{'speedup':>10}")
+    for name, hydrate, serializer, factory in cases:
+        for size in sizes:
+            rows = factory(size)
+            hydrated_time, hydrated = time_it(
+                lambda rs: [hydrate(dict(r)) for r in rs], rows)
+            raw_time, raw = time_it(lambda rs: [serializer(r) for r in rs], rows)
+            if json.dumps(hydrated) != json.dumps(raw):
+                raise SystemExit(f'{name}: raw serializer output differs from to_dict()')
+            print(f"{name:<10}{size:>8}{hydrated_time:>15.3f}{raw_time:>12.3f}"
+                  f"{hydrated_time / raw_time:>9.1f}x")
+
+
+if __name__ == '__main__':
+    run([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,200 @@
+"""
+Local OpenAI-compatible chat completions server for load tests.
+
+    python -m benchmarks.openai_stub --port 8089 --latency lognormal:-0.7,0.4 \
+        --token-delay 0.01 --error-rate 0.02
+
+Point the app at it with OPENAI_BASE_URL=http://127.0.0.1:8089/v1. Only
+POST /v1/chat/completions (plain and stream=True) is implemented, plus
+GET /stats with the prompt sizes and request counts seen so far.
+
+Latency specs: ``fixed:S``, ``uniform:LO,HI``, ``lognormal:MU,SIGMA``
+(seconds). Error injection answers a share of requests with 500/429 or
+lets them hang for ``--hang-seconds``.
+"""
+import argparse
+import json
+import random
+import statistics
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LOREM = ("This pick balances price and quality well and is in stock now. "
+         "Customers who want reliable everyday performance will appreciate "
+         "its build, features and value for money compared to alternatives.").split()
+
+
+def parse_latency(spec):
+    """Return a zero-argument sampler for a latency spec"""
+    kind, _, args = spec.partition(':')
+    values = [float(v) for v in args.split(',')] if args else []
+    if kind == 'fixed':
+        return lambda: values[0] if values else 0.0
+    if kind == 'uniform':
+        return lambda: random.uniform(values[0], values[1])
+    if kind == 'lognormal':
+        return lambda: random.lognormvariate(values[0], values[1])
+    raise ValueError(f'Unknown latency spec: {spec}')
+
+
+class StubState:
+    def __init__(self, latency, token_delay, tokens, error_rate, rate_limit_rate, hang_rate, hang_seconds):
+        self.latency = latency
+        self.token_delay = token_delay
+        self.tokens = tokens
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.lock = threading.Lock()
+        self.prompt_chars = []
+        self.requests = 0
+        self.errors = 0
+
+    def record(self, messages):
+        chars = sum(len(m.get('content') or '') for m in messages)
+        with self.lock:
+            self.requests += 1
+            self.prompt_chars.append(chars)
+        return chars
+
+    def stats(self):
+        with self.lock:
+            sizes = list(self.prompt_chars)
+            requests, errors = self.requests, self.errors
+        summary = {'requests': requests, 'errors': errors}
+        if sizes:
+            summary.update({
+                'prompt_chars_mean': round(statistics.mean(sizes), 1),
+                'prompt_chars_max': max(sizes),
+                # ~4 characters per token for English text
+                'prompt_tokens_est_mean': round(statistics.mean(sizes) / 4, 1),
+                'prompt_tokens_est_max': max(sizes) // 4
+            })
+        return summary
+
+
+def make_handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def send_json(self, status, body):
+            data = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path.rstrip('/').endswith('/stats'):
+                return self.send_json(200, state.stats())
+            self.send_json(404, {'error': {'message': 'Not found'}})
+
+        def do_POST(self):
+            if not self.path.rstrip('/').endswith('/chat/completions'):
+                return self.send_json(404, {'error': {'message': 'Not found'}})
+            length = int(self.headers.get('Content-Length', 0))
+            body = json.loads(self.rfile.read(length) or b'{}')
+            prompt_tokens = state.record(body.get('messages', [])) // 4
+
+            roll = random.random()
+            if roll < state.hang_rate:
+                time.sleep(state.hang_seconds)
+            elif roll < state.hang_rate + state.error_rate:
+                with state.lock:
+                    state.errors += 1
+                return self.send_json(500, {'error': {'message': 'Injected server error', 'type': 'server_error'}})
+            elif roll < state.hang_rate + state.error_rate + state.rate_limit_rate:
+                with state.lock:
+                    state.errors += 1
+                return self.send_json(429, {'error': {'message': 'Injected rate limit', 'type': 'rate_limit'}})
+
+            time.sleep(max(state.latency(), 0.0))
+            words = [random.choice(LOREM) for _ in range(state.tokens)]
+            completion_id = f'chatcmpl-{uuid.uuid4().hex[:12]}'
+            model = body.get('model', 'stub')
+
+            if body.get('stream'):
+                return self.stream(completion_id, model, words)
+
+            text = ' '.join(words)
+            self.send_json(200, {
+                'id': completion_id,
+                'object': 'chat.completion',
+                'created': int(time.time()),
+                'model': model,
+                'choices': [{
+                    'index': 0,
+                    'message': {'role': 'assistant', 'content': text},
+                    'finish_reason': 'stop'
+                }],
+                'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': len(words),
+                          'total_tokens': prompt_tokens + len(words)}
+            })
+
+        def stream(self, completion_id, model, words):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            for i, word in enumerate(words):
+                chunk = {
+                    'id': completion_id,
+                    'object': 'chat.completion.chunk',
+                    'created': int(time.time()),
+                    'model': model,
+                    'choices': [{'index': 0, 'delta': {'content': (' ' if i else '') + word},
+                                 'finish_reason': None}]
+                }
+                self.wfile.write(f'data: {json.dumps(chunk)}\n\n'.encode('utf-8'))
+                self.wfile.flush()
+                time.sleep(state.token_delay)
+            self.wfile.write(b'data: [DONE]\n\n')
+            self.wfile.flush()
+            self.close_connection = True
+
+    return Handler
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='OpenAI-compatible stub server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency', default='fixed:0.2', help='fixed:S | uniform:LO,HI | lognormal:MU,SIGMA')
+    parser.add_argument('--token-delay', type=float, default=0.0, help='seconds between streamed tokens')
+    parser.add_argument('--tokens', type=int, default=60, help='words per completion')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of requests answered with 500')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='share of requests answered with 429')
+    parser.add_argument('--hang-rate', type=float, default=0.0, help='share of requests that stall')
+    parser.add_argument('--hang-seconds', type=float, default=30.0)
+    return parser
+
+
+def start_server(args):
+    """Start the stub in a daemon thread and return (server, state)"""
+    state = StubState(
+        parse_latency(args.latency), args.token_delay, args.tokens,
+        args.error_rate, args.rate_limit_rate, args.hang_rate, args.hang_seconds
+    )
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+if __name__ == '__main__':
+    args = build_parser().parse_args()
+    server, _ = start_server(args)
+    print(f'OpenAI stub listening on http://{args.host}:{server.server_address[1]}/v1')
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -1,9 +1,41 @@
 import os
+import math
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
+def available_cpus():
+    """
+    CPUs this process may actually use: the scheduler affinity mask, capped
+    by a cgroup CPU quota when running in a container.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    
+    quota = None
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:  # cgroup v2
+            limit, period = f.read().split()[:2]
+            if limit != 'max':
+                quota = int(limit) / int(period)
+    except (OSError, ValueError):
+        try:
+            with open('/sys/fs/cgroup/cpu/cpu.cfs_quota_us') as f:  # cgroup v1
+                limit = int(f.read())
+            with open('/sys/fs/cgroup/cpu/cpu.cfs_period_us') as f:
+                period = int(f.read())
+            if limit > 0:
+                quota = limit / period
+        except (OSError, ValueError):
+            pass
+    
+    if quota is not None:
+        cpus = min(cpus, max(1, math.ceil(quota)))
+    return max(1, cpus)
+
 class Config:
     # Flask settings
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-key-please-change-in-production'
@@ -19,13 +51,109 @@ class Config:
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-secret-key-change-in-production'
     JWT_ACCESS_TOKEN_EXPIRES = 3600  # 1 hour
     
+    # Resolved-user cache for auth decorators
+    USER_CACHE_SIZE = int(os.environ.get('USER_CACHE_SIZE', 1024))
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL', 30))  # seconds
+    TOKEN_REVOCATION_SYNC_INTERVAL = int(os.environ.get('TOKEN_REVOCATION_SYNC_INTERVAL', 10))  # seconds
+    TOKEN_REVOCATION_SYNC_OVERLAP = int(os.environ.get('TOKEN_REVOCATION_SYNC_OVERLAP', 60))  # seconds re-read each sync
+    
+    # Production server settings (see gunicorn.conf.py)
+    # One worker per usable CPU plus one: each worker also runs a password
+    # hash pool, job runner threads and its own vector index, so the classic
+    # 2 * cores + 1 oversubscribes small containers
+    SERVER_WORKERS = int(os.environ.get('WEB_CONCURRENCY', available_cpus() + 1))
+    SERVER_THREADS = int(os.environ.get('SERVER_THREADS', 4))
+    SERVER_TIMEOUT = int(os.environ.get('SERVER_TIMEOUT', 60))  # seconds
+    SERVER_GRACEFUL_TIMEOUT = int(os.environ.get('SERVER_GRACEFUL_TIMEOUT', 30))  # seconds
+    SERVER_KEEPALIVE = int(os.environ.get('SERVER_KEEPALIVE', 5))  # seconds
+    SERVER_MAX_REQUESTS = int(os.environ.get('SERVER_MAX_REQUESTS', 0))  # 0 disables worker recycling
+    
+    # Semantic product search
+    # 'openai' embeds with the configured model and gives real semantic matching;
+    # 'hashing' is a local keyword-overlap fallback with no notion of synonyms
+    EMBEDDING_PROVIDER = os.environ.get('EMBEDDING_PROVIDER', 'openai' if os.environ.get('OPENAI_API_KEY') else 'hashing')
+    EMBEDDING_MODEL = os.environ.get('EMBEDDING_MODEL', 'openai/text-embedding-3-small')
+    EMBEDDING_DIM = int(os.environ.get('EMBEDDING_DIM', 512))  # hashing embedder only
+    SEMANTIC_INDEX_PATH = os.environ.get('SEMANTIC_INDEX_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance/semantic_index.npz'))
+    SEMANTIC_SYNC_INTERVAL = int(os.environ.get('SEMANTIC_SYNC_INTERVAL', 30))  # seconds between catch-up syncs
+    SEMANTIC_SYNC_OVERLAP = int(os.environ.get('SEMANTIC_SYNC_OVERLAP', 60))  # seconds re-read each sync
+    SEMANTIC_SNAPSHOT_INTERVAL = int(os.environ.get('SEMANTIC_SNAPSHOT_INTERVAL', 300))  # seconds between snapshots
+    
+    # Password hashing (methods: werkzeug 'pbkdf2:sha256:<iterations>' or 'bcrypt:<rounds>')
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:260000')
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))  # 0 hashes inline
+    PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 8))
+    PASSWORD_HASH_TIMEOUT = float(os.environ.get('PASSWORD_HASH_TIMEOUT', 10))  # seconds
+    
     # OpenAI settings
     OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY', '')
+    OPENAI_BASE_URL = os.environ.get('OPENAI_BASE_URL', 'https://models.github.ai/inference')
+    OPENAI_MODEL = os.environ.get('OPENAI_MODEL', 'openai/gpt-4.1')
+    AI_RANK_TOP_K = int(os.environ.get('AI_RANK_TOP_K', 20))  # products sent to the model per query
+    AI_CACHE_ENABLED = os.environ.get('AI_CACHE_ENABLED', 'true').lower() == 'true'
+    AI_CACHE_SIZE = int(os.environ.get('AI_CACHE_SIZE', 512))  # in-process entries per worker
+    AI_CACHE_TTL = int(os.environ.get('AI_CACHE_TTL', 3600))  # seconds
+    AI_TIMEOUT = float(os.environ.get('AI_TIMEOUT', 15))  # seconds per model call
+    AI_TIMEOUTS = {  # per-endpoint overrides
+        'recommend': float(os.environ.get('AI_TIMEOUT_RECOMMEND', 15)),
+        'recommend_category': float(os.environ.get('AI_TIMEOUT_RECOMMEND_CATEGORY', 10)),
+        'recommend_price': float(os.environ.get('AI_TIMEOUT_RECOMMEND_PRICE', 10)),
+        'generate_description': float(os.environ.get('AI_TIMEOUT_GENERATE_DESCRIPTION', 20))
+    }
+    AI_HEDGE_AFTER = float(os.environ.get('AI_HEDGE_AFTER', 0)) or None  # seconds before a hedged retry; unset disables
+    AI_CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get('AI_CIRCUIT_FAILURE_THRESHOLD', 5))
+    AI_CIRCUIT_SLOW_CALL_SECONDS = float(os.environ.get('AI_CIRCUIT_SLOW_CALL_SECONDS', 8))
+    AI_CIRCUIT_RESET_SECONDS = int(os.environ.get('AI_CIRCUIT_RESET_SECONDS', 30))
+    AI_BATCH_MAX_ITEMS = int(os.environ.get('AI_BATCH_MAX_ITEMS', 1000))
+    AI_BATCH_CONCURRENCY = int(os.environ.get('AI_BATCH_CONCURRENCY', 8))  # model calls in flight per batch
+    
+    # Background jobs ('thread' runs them in each web worker, 'external' leaves them to worker.py)
+    JOB_RUNNER = os.environ.get('JOB_RUNNER', 'thread')
+    JOB_THREADS = int(os.environ.get('JOB_THREADS', 2))
+    JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', 3))
+    JOB_RETRY_BACKOFF = int(os.environ.get('JOB_RETRY_BACKOFF', 5))  # seconds, doubled per attempt
+    JOB_VISIBILITY_TIMEOUT = int(os.environ.get('JOB_VISIBILITY_TIMEOUT', 300))  # seconds before a stuck job is retried
+    JOB_POLL_INTERVAL = float(os.environ.get('JOB_POLL_INTERVAL', 1.0))  # seconds
+    JOB_RETENTION = int(os.environ.get('JOB_RETENTION', 86400))  # seconds finished jobs are kept
+    
+    # Stock reservation settings
+    RESERVATION_TTL = int(os.environ.get('RESERVATION_TTL', 600))  # seconds a hold lasts unconfirmed
+    RESERVATION_MAX_QUANTITY = int(os.environ.get('RESERVATION_MAX_QUANTITY', 100))
+    RESERVATION_RETENTION = int(os.environ.get('RESERVATION_RETENTION', 86400))  # seconds finished holds are kept
+    RESERVATION_SWEEP_INTERVAL = int(os.environ.get('RESERVATION_SWEEP_INTERVAL', 30))  # seconds between expiry sweeps
     
     # Upload settings
     UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app/static/uploads')
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
+    USE_X_SENDFILE = os.environ.get('USE_X_SENDFILE', 'false').lower() == 'true'  # let the front proxy send files
+    
+    # Catalog import/export settings
+    EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 500))
+    IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', 1000))  # rows per bulk_write
+    BULK_PATCH_MAX_ITEMS = int(os.environ.get('BULK_PATCH_MAX_ITEMS', 1000))
+    
+    # Catalog read cache settings
+    CATALOG_CACHE_SIZE = int(os.environ.get('CATALOG_CACHE_SIZE', 256))
+    CATALOG_VERSION_TTL = float(os.environ.get('CATALOG_VERSION_TTL', 1.0))  # seconds
+    
+    # Response encoding settings
+    COMPRESSION_ENABLED = os.environ.get('COMPRESSION_ENABLED', 'true').lower() == 'true'
+    COMPRESSION_ALGORITHMS = [name.strip() for name in os.environ.get('COMPRESSION_ALGORITHMS', 'br,zstd,gzip').split(',')
+                              if name.strip()]  # server preference
+    COMPRESSION_LEVEL = int(os.environ.get('COMPRESSION_LEVEL', 6))  # gzip, 1-9
+    COMPRESSION_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', 4))  # 0-11
+    COMPRESSION_ZSTD_LEVEL = int(os.environ.get('COMPRESSION_ZSTD_LEVEL', 3))  # 1-22
+    COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))  # bytes
+    COMPRESSION_CACHE_SIZE = int(os.environ.get('COMPRESSION_CACHE_SIZE', 256))
+    COMPRESSION_MIMETYPES = {
+        'application/json', 'application/x-ndjson', 'application/msgpack',
+        'text/csv', 'text/event-stream', 'text/plain', 'text/html'
+    }
+    MSGPACK_ENABLED = os.environ.get('MSGPACK_ENABLED', 'true').lower() == 'true'
+    
+    # Facet settings
+    FACET_PRICE_BUCKETS = int(os.environ.get('FACET_PRICE_BUCKETS', 5))
 
 class DevelopmentConfig(Config):
     DEBUG = True
@@ -33,6 +161,8 @@ class DevelopmentConfig(Config):
 
 class TestingConfig(Config):
     TESTING = True
+    PASSWORD_HASH_WORKERS = 0
+    EMBEDDING_PROVIDER = 'hashing'
     MONGODB_SETTINGS = {
         'db': 'test_ai_product_mgmt',
         'host': 'mongomock://localhost'
@@ -27,10 +27,49 @@ export interface UpdateProductData extends Partial<CreateProductData> {
   is_active?: boolean;
 }
 
+export interface ProductFilters {
+  limit?: number;
+  cursor?: string;
+  category?: string;
+  min_price?: number;
+  max_price?: number;
+  in_stock?: boolean;
+  is_active?: boolean;
+}
+
+export interface ProductPage {
+  products: Product[];
+  next_cursor: string | null;
+  limit: number;
+}
+
+const buildQuery = (filters: ProductFilters = {}): string => {
+  const params = new URLSearchParams();
+  Object.entries(filters).forEach(([key, value]) => {
+    if (value !== undefined && value !== null && value !== '') {
+      params.append(key, String(value));
+    }
+  });
+  const query = params.toString();
+  return query ? `?${query}` : '';
+};
+
 export const productService = {
-  // Get all products
-  async getProducts(): Promise<Product[]> {
-    return apiClient.get(API_ENDPOINTS.PRODUCTS.BASE);
+  // Get a single page of products
+  async getProductsPage(filters: ProductFilters = {}): Promise<ProductPage> {
+    return apiClient.get(`${API_ENDPOINTS.PRODUCTS.BASE}${buildQuery(filters)}`);
+  },
+
+  // Get all products by following the pagination cursor
+  async getProducts(filters: ProductFilters = {}): Promise<Product[]> {
+    const products: Product[] = [];
+    let cursor: string | undefined = undefined;
+    do {
+      const page: ProductPage = await this.getProductsPage({ ...filters, limit: 200, cursor });
+      products.push(...page.products);
+      cursor = page.next_cursor || undefined;
+    } while (cursor);
+    return products;
   },
 
   // Get single product by ID
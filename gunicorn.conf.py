@@ -0,0 +1,49 @@
+"""
+Gunicorn settings for production serving.
+
+    gunicorn -c gunicorn.conf.py run:app
+
+Workers are pre-forked gthread workers, each with its own thread pool.
+Every value comes from Config so a container can be sized through the
+environment. Send SIGHUP to the master to replace the workers with the
+current code without dropping in-flight requests.
+"""
+import os
+from config import Config
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+worker_class = 'gthread'
+workers = Config.SERVER_WORKERS
+threads = Config.SERVER_THREADS
+timeout = Config.SERVER_TIMEOUT
+graceful_timeout = Config.SERVER_GRACEFUL_TIMEOUT
+keepalive = Config.SERVER_KEEPALIVE
+max_requests = Config.SERVER_MAX_REQUESTS
+max_requests_jitter = Config.SERVER_MAX_REQUESTS // 10
+# Loading the app in each worker lets SIGHUP pick up new code
+preload_app = False
+accesslog = '-'
+errorlog = '-'
+
+
+def on_starting(server):
+    os.makedirs(Config.UPLOAD_FOLDER, exist_ok=True)
+
+
+def post_fork(server, worker):
+    # A preloaded master may already hold MongoClient instances; they are not
+    # fork-safe, so drop them and let each worker connect on its own.
+    from mongoengine import connection
+    for alias in list(connection._connections):
+        connection._connections.pop(alias).close()
+    connection._dbs.clear()
+
+
+def post_worker_init(worker):
+    # Open the connection pool before the first request (MONGODB_SETTINGS
+    # uses connect=False so nothing is opened at import time).
+    from mongoengine.connection import get_db
+    try:
+        get_db().command('ping')
+    except Exception as e:
+        worker.log.warning(f"MongoDB warm-up failed: {e}")
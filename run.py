@@ -14,7 +14,7 @@ CORS(
     resources={
         r"/api/*": {
             "origins": [frontend_url, "http://localhost:3000", "http://127.0.0.1:3000"],
-            "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+            "methods": ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
             "allow_headers": ["Content-Type", "Authorization"],
             "supports_credentials": True
         }
@@ -32,7 +32,7 @@ def handle_preflight():
         if origin in ['http://localhost:3000', 'http://127.0.0.1:3000']:
             response.headers.add("Access-Control-Allow-Origin", origin)
         response.headers.add('Access-Control-Allow-Headers', "Content-Type, Authorization")
-        response.headers.add('Access-Control-Allow-Methods', "GET, POST, PUT, DELETE, OPTIONS")
+        response.headers.add('Access-Control-Allow-Methods', "GET, POST, PUT, PATCH, DELETE, OPTIONS")
         response.headers.add('Access-Control-Allow-Credentials', 'true')
         return response
 
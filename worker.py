@@ -0,0 +1,27 @@
+import os
+import signal
+import threading
+
+# Standalone job runner; use with JOB_RUNNER=external on the web processes.
+# Set before importing the app so Config doesn't start runner threads too.
+os.environ.setdefault('JOB_RUNNER', 'external')
+
+from app import create_app
+from app.utils.jobs import job_queue
+
+app = create_app(os.getenv('FLASK_ENV', 'development'))
+
+if __name__ == '__main__':
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *args: stop.set())
+    signal.signal(signal.SIGINT, lambda *args: stop.set())
+    
+    threads = [
+        threading.Thread(target=job_queue.run_forever, args=(app,), kwargs={'stop': stop})
+        for _ in range(app.config.get('JOB_THREADS', 2))
+    ]
+    for thread in threads:
+        thread.start()
+    print(f"Job worker started with {len(threads)} threads")
+    for thread in threads:
+        thread.join()